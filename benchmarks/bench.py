@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing as mp
+from datetime import datetime
+import numpy as np
+
+# 🛡️ PATH ANCHOR: benchmarks/ and src/ importable from anywhere
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+for path in (BENCH_DIR, SRC_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+# Every client in this harness is the deterministic local stand-in: no network, no spend
+os.environ["AETHER_BACKEND"] = "local"
+
+from synth_manuscripts import generate_manuscripts, sample_queries
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _summarize(latencies, units, unit_name):
+    """p50/p99/mean latency (ms) plus throughput in `unit_name`."""
+    ms = np.array(latencies) * 1000
+    total = float(np.sum(latencies))
+    return {
+        "runs": len(latencies),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(np.mean(ms)), 3),
+        "throughput": round(units / total, 2) if total else None,
+        "throughput_unit": unit_name
+    }
+
+def _make_queries(data_dir, n, seed):
+    # Phrased from generated node names so most resolve: escalations skip lineage assembly entirely
+    return sample_queries(os.path.join(data_dir, "manuscripts"), n, seed)
+
+def _count(statuses, status):
+    statuses[status] = statuses.get(status, 0) + 1
+
+# --- Stages (each runs in its own process so peak RSS is per stage) ---
+
+def bench_chunk_xml(data_dir, repeats, streaming):
+    from logic.indexer import AetherIndexer, discover_manuscripts
+    indexer = AetherIndexer(data_dir=data_dir)
+    files = discover_manuscripts(indexer.manuscripts_dir)
+    latencies, nodes = [], 0
+    for _ in range(repeats):
+        for region, path in files.items():
+            start = time.perf_counter()
+            nodes += len(indexer.chunk_xml(path, region, streaming=streaming))
+            latencies.append(time.perf_counter() - start)
+    return _summarize(latencies, nodes, "nodes/s")
+
+def bench_indexing(data_dir, region_parents):
+    from logic.indexer import AetherIndexer
+    results = {}
+    for label in ("cold", "warm_noop"):
+        indexer = AetherIndexer(data_dir=data_dir, region_parents=region_parents)
+        start = time.perf_counter()
+        stats = indexer.run_indexing_pipeline()
+        elapsed = time.perf_counter() - start
+        chunks = sum(stats.values()) - stats["removed"]
+        results[label] = dict(_summarize([elapsed], chunks, "chunks/s"), **stats)
+    return results
+
+def bench_load_fabric(data_dir, repeats, region_parents):
+    from logic.resolver import AetherEngine
+    engine = AetherEngine(data_dir=data_dir, region_parents=region_parents)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine._load_fabric()
+        # Shards map lazily; time the full load so results stay comparable
+        engine._snapshot.warm()
+        latencies.append(time.perf_counter() - start)
+    return dict(_summarize(latencies, repeats, "loads/s"), nodes=engine.fabric_node_count())
+
+def bench_query(data_dir, n_queries, batch_size, region_parents):
+    from logic.resolver import AetherEngine
+    engine = AetherEngine(data_dir=data_dir, region_parents=region_parents)
+
+    single, statuses = [], {}
+    for query in _make_queries(data_dir, n_queries, seed=1):
+        start = time.perf_counter()
+        status, _, _ = engine.get_aether_result(query)
+        single.append(time.perf_counter() - start)
+        _count(statuses, status)
+
+    batched, batched_statuses, queries = [], {}, _make_queries(data_dir, n_queries, seed=2)
+    for i in range(0, len(queries), batch_size):
+        start = time.perf_counter()
+        results = engine.get_aether_results(queries[i:i + batch_size])
+        batched.append(time.perf_counter() - start)
+        for status, _, _ in results:
+            _count(batched_statuses, status)
+
+    # 🧩 Region-scoped: only the deepest overlay's lineage shards are searched
+    region = max(engine.regions(), key=lambda r: len(engine._snapshot.region_lineage(r)), default=None)
+    scoped, scoped_statuses = [], {}
+    for query in _make_queries(data_dir, n_queries, seed=1):
+        start = time.perf_counter()
+        status, _, _ = engine.get_aether_result(query, region=region)
+        scoped.append(time.perf_counter() - start)
+        _count(scoped_statuses, status)
+
+    return {
+        "single": dict(_summarize(single, n_queries, "queries/s"), statuses=statuses),
+        "batched": dict(_summarize(batched, n_queries, "queries/s"), batch_size=batch_size, statuses=batched_statuses),
+        "scoped": dict(_summarize(scoped, n_queries, "queries/s"), region=region, statuses=scoped_statuses)
+    }
+
+def bench_audit(data_dir, n_queries, region_parents):
+    """End-to-end audit: concurrent retrieval + streamed answer from the local chat stand-in."""
+    from logic.resolver import AetherEngine
+    from logic.clients import build_client
+    from logic.audit import retrieve_contexts, build_combined_xml, stream_audit_answer, classify_answer
+    engine = AetherEngine(data_dir=data_dir, region_parents=region_parents)
+    client = build_client()
+
+    totals, first_tokens, statuses = [], [], {}
+    for query in _make_queries(data_dir, n_queries, seed=3):
+        start = time.perf_counter()
+        (status, _, payload), (_, _, global_context), _ = retrieve_contexts(engine, query)
+        _count(statuses, status)
+        tokens = stream_audit_answer(client, build_combined_xml(payload, global_context), query)
+        answer = next(tokens)
+        first_tokens.append(time.perf_counter() - start)
+        answer += "".join(tokens)
+        classify_answer(answer)
+        totals.append(time.perf_counter() - start)
+    return {"total": dict(_summarize(totals, n_queries, "audits/s"), statuses=statuses),
+            "time_to_first_token": _summarize(first_tokens, n_queries, "audits/s")}
+
+def _child(queue, fn, args):
+    baseline = _peak_rss_mb()
+    result = fn(*args)
+    result.update(rss_baseline_mb=baseline, peak_rss_mb=_peak_rss_mb())
+    queue.put(result)
+
+def run_isolated(fn, *args):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, fn, args))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def compare(current, baseline_path):
+    """Prints p50 deltas against a previous results file."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+
+    def flatten(stages, prefix=""):
+        for key, value in stages.items():
+            if isinstance(value, dict) and "p50_ms" in value:
+                yield prefix + key, value["p50_ms"]
+            elif isinstance(value, dict):
+                yield from flatten(value, f"{prefix}{key}.")
+
+    before = dict(flatten(baseline["stages"]))
+    print(f"\n📊 p50 vs {baseline['meta'].get('git_revision') or baseline_path}:")
+    for name, p50 in flatten(current["stages"]):
+        if name in before and before[name]:
+            print(f"  {name:<36} {before[name]:>10.3f} -> {p50:>10.3f} ms  ({(p50 / before[name] - 1) * 100:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AETHER_VERITAS offline benchmark suite.")
+    parser.add_argument("--nodes", type=int, default=2000, help="Logic nodes in the synthetic Global base")
+    parser.add_argument("--regions", type=int, default=4, help="Synthetic regional overlays")
+    parser.add_argument("--depth", type=int, default=2, help="Overlay inheritance chain depth")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per retrieval benchmark")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for get_aether_results")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats for parse/load benchmarks")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="aether_bench_") as data_dir:
+        region_parents = generate_manuscripts(os.path.join(data_dir, "manuscripts"),
+                                              args.nodes, args.regions, args.depth)
+        stages = {}
+        print("⏱️ chunk_xml (DOM)...")
+        stages["chunk_xml"] = run_isolated(bench_chunk_xml, data_dir, args.repeats, False)
+        print("⏱️ chunk_xml (streaming)...")
+        stages["chunk_xml_streaming"] = run_isolated(bench_chunk_xml, data_dir, args.repeats, True)
+        print("⏱️ run_indexing_pipeline...")
+        stages["run_indexing_pipeline"] = run_isolated(bench_indexing, data_dir, region_parents)
+        print("⏱️ _load_fabric...")
+        stages["load_fabric"] = run_isolated(bench_load_fabric, data_dir, args.repeats, region_parents)
+        print("⏱️ get_aether_result...")
+        stages["get_aether_result"] = run_isolated(bench_query, data_dir, args.queries, args.batch_size, region_parents)
+        print("⏱️ audit pipeline...")
+        stages["audit"] = run_isolated(bench_audit, data_dir, max(1, args.queries // 4), region_parents)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "params": vars(args)
+        },
+        "stages": stages
+    }
+
+    output = args.output or os.path.join(BENCH_DIR, "results", f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(stages, indent=2))
+    print(f"✅ Benchmark results saved to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    # Timings of queries that all escalated only measure the early-return path
+    for name, stage in (("get_aether_result.single", stages["get_aether_result"]["single"]),
+                        ("audit.total", stages["audit"]["total"])):
+        print(f"🔎 {name} statuses: {stage['statuses']}")
+        if not stage["statuses"].get("SUCCESS"):
+            sys.exit(f"❌ No {name} query resolved: lineage assembly was never measured.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import random
+import argparse
+import lxml.etree as ET
+
+# Vocabulary used to give synthetic nodes searchable, overlapping intent text
+TERMS = ["Theft", "Collision", "Glass", "Flood", "Seismic", "Mileage", "Youthful", "Student", "Telematics",
+         "Bundle", "Loyalty", "Garage", "Commute", "Rideshare", "Classic", "Solar", "Pet", "Towing",
+         "Rental", "Liability", "Medical", "Uninsured", "Deductible", "Surcharge", "Discount"]
+
+def _name(rng, prefix, i):
+    return f"{prefix}_{rng.choice(TERMS)}{rng.choice(TERMS)}_{i}"
+
+def _write_manuscript(path, region, coverages, factors, forms, rules=3):
+    """coverages/factors/forms: lists of (name, inheritsFrom or None, attrs dict)."""
+    def attrs(name, inherits, extra):
+        parts = [f'name="{name}"']
+        if inherits:
+            parts.append(f'inheritsFrom="{inherits}"')
+        parts.extend(f'{k}="{v}"' for k, v in extra.items())
+        return " ".join(parts)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<Manuscript region="{region}">\n')
+        for name, inherits, extra in coverages:
+            f.write(f'  <Coverage {attrs(name, inherits, extra)}>\n')
+            for value in (250, 500):
+                f.write(f'    <Deductible value="{value}"/>\n')
+            f.write('  </Coverage>\n')
+        f.write('  <RiskFactors>\n')
+        for name, inherits, extra in factors:
+            f.write(f'    <Factor {attrs(name, inherits, extra)}/>\n')
+        f.write('  </RiskFactors>\n  <FormMasterList>\n')
+        for name, inherits, extra in forms:
+            f.write(f'    <Form id="{name}" title="{extra["title"]}"/>\n')
+        f.write('  </FormMasterList>\n  <Governance_Rules>\n')
+        for r in range(rules):
+            f.write(f'    <Rule id="{region}-R{r}">Certified source required.</Rule>\n')
+        f.write('  </Governance_Rules>\n</Manuscript>\n')
+
+def generate_manuscripts(out_dir, nodes=1000, regions=2, depth=1, overlay_ratio=0.3, seed=0):
+    """
+    🧪 SYNTHETIC MANUSCRIPTS: A Global base with `nodes` logic nodes plus `regions`
+    overlays. Overlays are grouped into inheritance chains `depth` deep
+    (Global <- R00 <- R01 ...); every overlay in a chain re-declares the same
+    `overlay_ratio` share of Global nodes with inheritsFrom, so their lineage
+    is up to `depth + 1` hops long.
+    Returns the region_parents map to hand to AetherEngine.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    n_cov = max(1, nodes // 4)
+    n_forms = max(1, nodes // 10)
+    n_fac = max(1, nodes - n_cov - n_forms)
+    base = {
+        "coverages": [(_name(rng, "COV", i), None, {"limit": rng.choice([25000, 50000, 100000])}) for i in range(n_cov)],
+        "factors": [(_name(rng, "FAC", i), None, {"multiplier": f"{rng.uniform(0.7, 1.3):.2f}"}) for i in range(n_fac)],
+        "forms": [(f"FRM-{i:05d}", None, {"title": f"{rng.choice(TERMS)} Notice"}) for i in range(n_forms)],
+    }
+    _write_manuscript(os.path.join(out_dir, "global_base.xml"), "Global", **base)
+
+    def sample(items):
+        return [name for name, _, _ in rng.sample(items, max(1, int(len(items) * overlay_ratio)))]
+
+    def override(names, key_attr):
+        return [(name, name, {key_attr: f"{rng.uniform(0.7, 1.3):.2f}"}) for name in names]
+
+    region_parents = {}
+    for r in range(regions):
+        region = f"R{r:02d}"
+        if r % depth == 0:
+            # New chain: every overlay in it overrides the same nodes, so each gets the full depth
+            chain_coverages, chain_factors = sample(base["coverages"]), sample(base["factors"])
+        else:
+            region_parents[region] = f"R{r - 1:02d}"
+
+        _write_manuscript(
+            os.path.join(out_dir, f"{region.lower()}_overlay.xml"), region,
+            coverages=override(chain_coverages, "regionalFactor"),
+            factors=override(chain_factors, "multiplier"),
+            forms=[(f"{region}-FRM-{i:04d}", None, {"title": f"{region} {rng.choice(TERMS)} Disclosure"})
+                   for i in range(max(1, int(n_forms * overlay_ratio)))]
+        )
+    return region_parents
+
+def sample_queries(manuscripts_dir, n, seed=0, overlay_share=0.5):
+    """
+    Natural-language questions about generated nodes, phrased from their names and region
+    so they resolve (hash-embedder tokens overlap the node text) instead of all escalating.
+    `overlay_share` of them target overlay nodes, so lineage and flattening are exercised.
+    Every query is distinct, so the query-embedding cache never short-circuits a measurement.
+    """
+    rng = random.Random(seed)
+    base, overlay = [], []
+    for file_name in sorted(os.listdir(manuscripts_dir)):
+        root = ET.parse(os.path.join(manuscripts_dir, file_name)).getroot()
+        region = root.get("region")
+        for node in root.iter("Coverage", "Factor"):
+            (overlay if node.get("inheritsFrom") else base).append((region, node.get("name"), node.tag))
+    questions = ["What does {name} set for {region}?", "Which {tag} rules apply to {name} in {region}?",
+                 "Explain the {name} {tag} for {region}"]
+    queries = []
+    for i in range(n):
+        pool = overlay if overlay and (not base or rng.random() < overlay_share) else base
+        region, name, tag = rng.choice(pool)
+        queries.append(f"{rng.choice(questions).format(name=name, region=region, tag=tag.lower())} (case {i})")
+    return queries
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic AETHER manuscripts.")
+    parser.add_argument("out_dir", help="Target directory (e.g. data/manuscripts)")
+    parser.add_argument("--nodes", type=int, default=1000, help="Logic nodes in the Global base")
+    parser.add_argument("--regions", type=int, default=2, help="Number of regional overlays")
+    parser.add_argument("--depth", type=int, default=1, help="Overlay inheritance chain depth")
+    parser.add_argument("--overlay-ratio", type=float, default=0.3, help="Share of parent nodes each overlay overrides")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    parents = generate_manuscripts(args.out_dir, args.nodes, args.regions, args.depth, args.overlay_ratio, args.seed)
+    print(f"✅ Wrote Global + {args.regions} overlays to {args.out_dir} (region parents: {parents or 'all Global'})")
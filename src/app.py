@@ -2,8 +2,8 @@ import os
 import sys
 import streamlit as st
 import pandas as pd
-from openai import OpenAI
 import re
+import time
 from datetime import datetime
 
 # 🛡️ FIX 1: ABSOLUTE PATH LOGIC
@@ -11,31 +11,20 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed")
-V_PATH = os.path.join(DATA_PATH, "vectors.npy")
-M_PATH = os.path.join(DATA_PATH, "metadata.json")
-
-def ensure_logic_fabric():
-    if not os.path.exists(V_PATH) or not os.path.exists(M_PATH):
-        with st.spinner("🛡️ AETHER_VERITAS: Reconstructing Knowledge Fabric..."):
-            try:
-                from logic.indexer import AetherIndexer
-                os.makedirs(DATA_PATH, exist_ok=True)
-                indexer = AetherIndexer()
-                indexer.run_indexing_pipeline() 
-            except Exception as e:
-                st.error(f"Provisioning failed: {e}")
-
-ensure_logic_fabric()
-
 try:
-    from logic.resolver import AetherEngine 
+    from logic.resolver import AetherEngine, GLOBAL_REGION
+    from logic.audit import retrieve_contexts, build_combined_xml, stream_audit_answer, classify_answer, SYSTEM_INSTRUCTIONS_VERSION
+    from logic.answer_cache import AnswerCache
+    from logic.clients import build_client
+    from logic.telemetry import LatencyRecorder
+    from logic.provisioner import BackgroundProvisioner
+    from logic.journal import AuditJournal, HISTORY_PAGE_SIZE
 except ImportError as e:
     st.error(f"Critical Error: Could not find AetherEngine. {e}")
     st.stop()
 
-api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+# 🛡️ HF Secret Priority (or the offline stand-in when AETHER_BACKEND=local)
+client = build_client()
 
 st.set_page_config(page_title="AETHER_VERITAS Command", page_icon="🛡️", layout="wide")
 
@@ -47,6 +36,7 @@ st.markdown("""
     .governed-header { color: #3fb950; font-size: 1.5rem; font-weight: bold; display: flex; align-items: center; gap: 10px; }
     .escalated-header { color: #f85149; font-size: 1.5rem; font-weight: bold; display: flex; align-items: center; gap: 10px; }
     .self-heal-badge { background-color: #1f6feb; color: white; border-radius: 4px; padding: 4px 12px; font-size: 0.85rem; font-weight: bold; margin-bottom: 15px; display: inline-block; }
+    .cache-badge { background-color: #30363D; color: #C9D1D9; border-radius: 4px; padding: 4px 12px; font-size: 0.85rem; font-weight: bold; margin-bottom: 15px; display: inline-block; }
     .anti-hal-badge { color: #f85149; font-weight: bold; margin-bottom: 10px; border: 1px solid #f85149; padding: 5px; border-radius: 4px; display: inline-block; }
     </style>
     """, unsafe_allow_html=True)
@@ -55,18 +45,62 @@ st.markdown("""
 def load_engine(): return AetherEngine()
 engine = load_engine()
 
-if "audit_log" not in st.session_state: st.session_state.audit_log = []
+@st.cache_resource
+def load_answer_cache(): return AnswerCache()
+answer_cache = load_answer_cache()
+
+@st.cache_resource
+def load_latency_recorder(): return LatencyRecorder()
+latency_recorder = load_latency_recorder()
+
+@st.cache_resource
+def load_provisioner(): return BackgroundProvisioner()
+provisioner = load_provisioner()
+
+@st.cache_resource
+def load_journal(): return AuditJournal()
+journal = load_journal()
+
+# 🏗️ No fabric yet: provision in the background (one worker indexes, the rest wait on its snapshot).
+# A failed run is retried here too, after a back-off, so a transient error does not strand the deployment.
+if not engine.fabric_node_count() and provisioner.provisioning_due():
+    provisioner.start(reason="provisioning")
+
+@st.fragment(run_every="3s")
+def indexing_status_panel():
+    status = provisioner.status()
+    state = status.get("state")
+    if state == "running":
+        phase = status.get("phase", "starting")
+        if phase == "parsing":
+            done, total, unit = status.get("files_parsed", 0), status.get("files_total", 0), "manuscripts parsed"
+        elif phase == "embedding":
+            done, total, unit = status.get("chunks_embedded", 0), status.get("chunks_total", 0), "chunks embedded"
+        else:
+            done, total, unit = 0, 0, phase
+        label = f"🏗️ Indexing: {done}/{total} {unit}" if total else f"🏗️ Indexing: {unit}..."
+        st.progress(done / total if total else 0.0, text=label)
+    elif state == "failed":
+        retry = "Retrying automatically." if not engine.fabric_node_count() else "Use Force Cloud Resync to retry."
+        st.error(f"Indexing failed: {status.get('error')}. {retry}")
+    elif state == "interrupted":
+        st.warning("Last indexing run was interrupted. Use Force Cloud Resync to retry.")
+
+if "last_audit" not in st.session_state: st.session_state.last_audit = None
+if "history_pages" not in st.session_state: st.session_state.history_pages = 1
+
+# 🧾 Running totals from the journal: one row read, however long the history is
+governance = journal.metrics()
 
 with st.sidebar:
     st.title("⚖️ VERITAS Hub")
     
     # --- ADDED: DOWNLOAD AUDIT LOG FUNCTIONALITY ---
-    if st.session_state.audit_log:
-        export_df = pd.DataFrame(st.session_state.audit_log)
-        csv_data = export_df.to_csv(index=False).encode('utf-8')
+    if governance["audits"]:
         st.download_button(
             label="📥 Download Audit Log (CSV)",
-            data=csv_data,
+            # Deferred: the journal is only read, page by page into a spooled file, when the button is clicked
+            data=journal.export_file,
             file_name=f"AETHER_VERITAS_Log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv",
             use_container_width=True,
@@ -74,73 +108,105 @@ with st.sidebar:
         )
 
     if st.button("🔄 Force Cloud Resync", use_container_width=True):
-        if os.path.exists(V_PATH): os.remove(V_PATH)
-        st.cache_resource.clear()
-        st.rerun()
+        # Incremental resync in the background: audits keep using the current snapshot
+        # until the new one is published, then the shared engine swaps it in
+        if provisioner.start(reason="resync"):
+            st.toast("🛡️ AETHER_VERITAS: Resyncing Knowledge Fabric in the background...")
+        else:
+            st.toast("⏳ A resync is already in progress.")
+    indexing_status_panel()
     
     st.divider()
     st.subheader("📈 Governance Metrics")
-    escalated = sum(1 for l in st.session_state.audit_log if l['status'] == "ESCALATED")
-    governed = sum(1 for l in st.session_state.audit_log if l['status'] == "GOVERNED")
-    healed_count = sum(1 for l in st.session_state.audit_log if l.get('healed'))
-    
     m1, m2 = st.columns(2)
-    m1.metric("Governed", governed)
-    m2.metric("Escalated", escalated)
-    st.metric("Self-Healed (Global)", healed_count)
+    m1.metric("Governed", governance["governed"])
+    m2.metric("Escalated", governance["escalated"])
+    st.metric("Self-Healed (Global)", governance["healed"])
+    st.caption(f"📸 Fabric snapshot: `{engine.fabric_version or 'legacy'}`")
+    cache_stats = engine.embedding_cache.stats()
+    st.metric("Query Embedding Cache", f"{cache_stats['hit_rate']:.0%} hit rate",
+              help=f"{cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['disk_hits']} from disk)")
+
+    # ⏱️ Rolling per-stage latency across recent audits
+    stage_latency = latency_recorder.percentiles()
+    if stage_latency:
+        st.caption("⏱️ Stage Latency (ms, rolling)")
+        latency_df = pd.DataFrame(stage_latency).T[["p50", "p95"]].round(1)
+        st.dataframe(latency_df, use_container_width=True)
     
     st.divider()
-    if st.button("Reset Session History", use_container_width=True):
-        st.session_state.audit_log = []
+    if st.button("Clear Current Result", use_container_width=True):
+        # The journal is append-only: this only clears this session's audit card
+        st.session_state.last_audit = None
         st.rerun()
 
 st.header("🛡️ AETHER_VERITAS: Manuscript Command Center")
 tab1, tab2, tab3 = st.tabs(["🚀 Audit Portal", "📖 VERITAS FAQ", "📋 Prompt Library"])
 
 with tab1:
+    fabric_ready = bool(engine.fabric_node_count())
+    if not fabric_ready:
+        st.info("🏗️ The Knowledge Fabric is being provisioned in the background. Audits will resume once it is published.")
     query = st.text_input("Consulting AETHER layers...", placeholder="Enter query (e.g., 'Safe Driver discount')")
+    # 🧩 Jurisdiction scope: search only that overlay's lineage shards ("All" = every shard).
+    # No silent default: an unnoticed state would turn other states' questions into data gaps.
+    # The choice is kept in session state (key) for the auditor's later audits.
+    regions = engine.regions()
+    options = [r for r in regions if r != GLOBAL_REGION] + [r for r in regions if r == GLOBAL_REGION] + ["All"]
+    jurisdiction = st.selectbox("Jurisdiction", options, index=None if len(options) > 1 else 0, key="jurisdiction",
+                                placeholder="Choose a jurisdiction...",
+                                help="'All' searches every region shard and keeps them all loaded.")
     
-    if st.button("Execute Governance Audit", type="primary"):
+    # Disabled until the first fabric is published and a jurisdiction is chosen: an audit
+    # journals a ticket that can never be retracted
+    if st.button("Execute Governance Audit", type="primary", disabled=not fabric_ready or jurisdiction is None):
+        timings = {}
+        audit_start = time.perf_counter()
         with st.spinner("Reconciling XML Layers..."):
-            status_code, score, result_payload = engine.get_aether_result(query)
-            _, _, global_context = engine.get_aether_result("Global Base Layer Master")
+            # Regional + Global retrievals run concurrently
+            (status_code, score, result_payload), (_, _, global_context), fabric_version = retrieve_contexts(
+                engine, query, timings, region=None if jurisdiction == "All" else jurisdiction)
             
-            combined_xml = f"PRIMARY_MATCH (Regional): {result_payload['metadata'].get('raw_xml', '')}\n\nGLOBAL_MASTER: {global_context['metadata'].get('raw_xml', '')}"
-            ticket_id = f"VRTS-{len(st.session_state.audit_log)+101}"
-
-            # 🛡️ THE IDEAL RESPONSE SYSTEM INSTRUCTIONS
-            system_instructions = """
-            You are the AETHER_VERITAS Thought Partner. 
-
-            ### THE IDEAL RESPONSE PROTOCOL:
-            1. CATEGORY LOCK: If the query is about 'Deductibles', stay strictly in that node. Do NOT mention Seismic, Environmental, or Mileage data.
-            2. SIBLING RULE: If a requested value (like 1000) is missing, find the values that DO exist in that same category. Tell me: "I don't see 1000, but I do see the 250 and 500 options available."
-            3. TRACEABILITY: If you pull from Global because Regional is blank, you MUST explicitly state you 'self-healed' the audit.
-            4. TONE: Professional but natural peer-to-peer conversation. "I've reviewed the manuscripts..." or "I noticed a gap..."
-            5. ESCALATION: If missing everywhere, state: "I am escalating a ticket for this data gap."
-
-            End with exactly 'RESULT: GOVERNED' or 'RESULT: DATA GAP DETECTED'.
-            """
-            res = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "system", "content": system_instructions}, 
-                          {"role": "user", "content": f"### MANUSCRIPT CONTEXT ###\n{combined_xml}\n\nQuery: {query}"}],
-                temperature=0.0
-            )
-            answer = res.choices[0].message.content
+        if status_code == "ERROR":
+            # No ticket, no LLM call, nothing journaled: the fabric could not answer at all
+            st.error(result_payload['metadata']['raw_xml'])
+        else:
+            combined_xml = build_combined_xml(result_payload, global_context)
+            ticket_id = journal.issue_ticket_id()
+
+            # ♻️ Same instructions + query + manuscript context => reuse the temperature-0 answer
+            answer_cache.sync_fabric_version(fabric_version)
+            cache_key = AnswerCache.make_key(SYSTEM_INSTRUCTIONS_VERSION, query, combined_xml)
+            cached = answer_cache.get(cache_key)
+
+            if cached:
+                answer, status, is_healed = cached["response"], cached["status"], cached["healed"]
+            else:
+                # ⚡ Stream the answer into the audit card as it is generated
+                st.markdown('<div class="audit-card">', unsafe_allow_html=True)
+                st.markdown(f'<div class="governed-header">⏳ AUDITING | {ticket_id}</div>', unsafe_allow_html=True)
+                answer = st.write_stream(stream_audit_answer(client, combined_xml, query, timings))
+                st.markdown('</div>', unsafe_allow_html=True)
             
-            is_gap = "DATA GAP" in answer.upper()
-            status = "ESCALATED" if is_gap else "GOVERNED"
-            is_healed = "SELF-HEAL" in answer.upper() or "GLOBAL" in answer.upper()
-
-            st.session_state.audit_log.insert(0, {
-                "id": ticket_id, "query": query, "status": status, 
-                "healed": is_healed, "response": answer
-            })
+                # Classification needs the full answer, so it happens once the stream finishes
+                status, is_healed = classify_answer(answer)
+                answer_cache.put(cache_key, {"id": ticket_id, "response": answer, "status": status, "healed": is_healed})
+
+            timings["total"] = (time.perf_counter() - audit_start) * 1000
+            latency_recorder.record(timings)
+            latency_recorder.write_prometheus()
+
+            # 🧾 Journaled for every worker; per-stage timings travel with the entry into the CSV export
+            st.session_state.last_audit = journal.append({
+                "id": ticket_id, "query": query, "jurisdiction": jurisdiction, "status": status, 
+                "healed": is_healed, "response": answer, "fabric_version": fabric_version,
+                # Provenance: cached answers point back at the audit that produced them
+                "cache_hit": bool(cached), "cached_from": cached["id"] if cached else ""
+            }, timings)
             st.rerun()
 
-    if st.session_state.audit_log:
-        log = st.session_state.audit_log[0]
+    if st.session_state.last_audit:
+        log = st.session_state.last_audit
         st.markdown('<div class="audit-card">', unsafe_allow_html=True)
         if log['status'] == "GOVERNED":
             st.markdown(f'<div class="governed-header">✅ GOVERNED | {log["id"]}</div>', unsafe_allow_html=True)
@@ -148,6 +214,7 @@ with tab1:
         else:
             st.markdown(f'<div class="escalated-header">🚨 ESCALATED | {log["id"]}</div>', unsafe_allow_html=True)
             st.markdown('<div class="anti-hal-badge">🛡️ ANTI-HALLUCINATION: SOURCE DATA ABSENT</div>', unsafe_allow_html=True)
+        if log.get('cache_hit'): st.markdown(f'<div class="cache-badge">♻️ CACHED ANSWER (from {log["cached_from"]})</div>', unsafe_allow_html=True)
         st.write(log['response'])
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -215,11 +282,22 @@ with tab3:
         ]
         for p in gap_prompts: st.code(p, language=None)
 
-if st.session_state.audit_log:
+if governance["audits"]:
     st.divider()
     st.subheader("📜 Audit History")
-    for log in st.session_state.audit_log:
+    # Keyset-paginated journal reads: only the pages on screen are fetched
+    history, before = [], None
+    for _ in range(st.session_state.history_pages):
+        page = journal.history(HISTORY_PAGE_SIZE, before)
+        history.extend(page)
+        if len(page) < HISTORY_PAGE_SIZE:
+            break
+        before = page[-1]["seq"]
+    for log in history:
         status_icon = "🟢" if log['status'] == "GOVERNED" else "🔴"
         heal_icon = " 🛡️" if log['healed'] else ""
         with st.expander(f"{status_icon}{heal_icon} {log['id']} | {log['query']}"):
-            st.write(log['response'])
\ No newline at end of file
+            st.write(log['response'])
+    if len(history) < governance["audits"] and st.button("Load older audits"):
+        st.session_state.history_pages += 1
+        st.rerun()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+# 🛡️ CLOUD-RESILIENT PATH ANCHOR
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if "logic" in BASE_DIR:
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+else:
+    PROJECT_ROOT = BASE_DIR
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.vector_store import VECTOR_DTYPE, load_vectors, normalize_rows, top_k
+
+ANN_DIRNAME = "ivf"
+ANN_MIN_VECTORS = 20000      # below this, exact brute force is already fast and exact
+ANN_DEFAULT_PROBES = 8       # recall/latency knob: more lists scanned = higher recall, slower
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 50000
+ASSIGN_BLOCK_ROWS = 65536
+
+def _assign(vectors, centroids):
+    """Nearest centroid (max dot product) per row, in blocks to bound peak memory."""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=VECTOR_DTYPE)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+def _spherical_kmeans(sample, n_lists, iterations, rng):
+    """Plain numpy k-means on the unit sphere; empty lists are re-seeded from random rows."""
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    ⚡ INVERTED-FILE ANN INDEX:
+    A k-means coarse quantizer splits the fabric into lists; a query only scores
+    the rows of its `n_probe` closest lists instead of the whole matrix.
+    """
+    def __init__(self, centroids, list_offsets, list_rows):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, iterations=KMEANS_ITERATIONS, sample_size=KMEANS_SAMPLE_SIZE, seed=0):
+        rng = np.random.default_rng(seed)
+        n = len(vectors)
+        n_lists = max(1, min(n_lists or int(np.sqrt(n)), n))
+
+        sample_rows = np.sort(rng.choice(n, min(sample_size, n), replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=VECTOR_DTYPE)
+        centroids = _spherical_kmeans(sample, min(n_lists, len(sample)), iterations, rng)
+
+        # Group row ids by list so each list is one contiguous slice
+        assignments = _assign(vectors, centroids)
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids, list_offsets, list_rows)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+        np.save(os.path.join(directory, "list_offsets.npy"), self.list_offsets)
+        np.save(os.path.join(directory, "list_rows.npy"), self.list_rows)
+
+    @classmethod
+    def load(cls, directory):
+        if not os.path.exists(os.path.join(directory, "list_rows.npy")):
+            return None
+        return cls(
+            np.load(os.path.join(directory, "centroids.npy")),
+            np.load(os.path.join(directory, "list_offsets.npy")),
+            np.load(os.path.join(directory, "list_rows.npy"), mmap_mode='r')
+        )
+
+    def search(self, vectors, q_vec, k, n_probe=ANN_DEFAULT_PROBES):
+        """Returns (rows, scores) best first, scoring only the probed lists."""
+        probed = top_k(self.centroids @ q_vec, min(n_probe, self.n_lists))
+        candidates = np.concatenate(
+            [self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probed]
+        )
+        if len(candidates) == 0:
+            return candidates, np.array([], dtype=VECTOR_DTYPE)
+        candidates.sort()  # sequential reads through the memory map
+        sims = np.asarray(vectors[candidates]) @ q_vec
+        best = top_k(sims, k)
+        return candidates[best], sims[best]
+
+def recall_report(vectors, index, queries, k=3, probes=(1, 2, 4, 8, 16, 32)):
+    """Recall@k and mean latency of the IVF path per n_probe, against exact brute force."""
+    def timed(fn):
+        start = time.perf_counter()
+        out = [fn(q) for q in queries]
+        return out, (time.perf_counter() - start) * 1000 / len(queries)
+
+    exact, exact_ms = timed(lambda q: set(top_k(vectors @ q, k).tolist()))
+    report = {"vectors": len(vectors), "n_lists": index.n_lists, "k": k,
+              "exact_ms": round(exact_ms, 4), "probes": []}
+    for n_probe in probes:
+        if n_probe > index.n_lists:
+            break
+        approx, ann_ms = timed(lambda q: set(index.search(vectors, q, k, n_probe)[0].tolist()))
+        recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+        report["probes"].append({"n_probe": n_probe, "recall": round(float(recall), 4),
+                                 "ann_ms": round(ann_ms, 4), "speedup": round(exact_ms / ann_ms, 2)})
+    return report
+
+if __name__ == "__main__":
+    # 📈 Recall-vs-latency report for one shard of the current fabric (queries = jittered shard rows)
+    # Usage: python ann.py [REGION]  (defaults to the Global shard)
+    from logic.snapshots import fabric_dir, shard_path, read_shard_index
+    processed_dir = os.path.join(PROJECT_ROOT, "data", "processed")
+    live_dir = fabric_dir(processed_dir)
+    if read_shard_index(live_dir) is not None:
+        live_dir = shard_path(live_dir, sys.argv[1].upper() if len(sys.argv) > 1 else "GLOBAL")
+    vectors = load_vectors(os.path.join(live_dir, "vectors.npy"))
+    index = IVFIndex.load(os.path.join(live_dir, ANN_DIRNAME)) or IVFIndex.build(vectors)
+
+    rng = np.random.default_rng(42)
+    picks = rng.choice(len(vectors), min(200, len(vectors)), replace=False)
+    queries = normalize_rows(np.asarray(vectors[picks]) + rng.normal(0, 0.02, (len(picks), vectors.shape[1])))
+
+    report = recall_report(np.asarray(vectors), index, queries)
+    print(f"Exact: {report['exact_ms']:.3f} ms/query over {report['vectors']} vectors, {report['n_lists']} lists")
+    for row in report["probes"]:
+        print(f"  n_probe={row['n_probe']:>3}  recall@{report['k']}={row['recall']:.3f}  "
+              f"{row['ann_ms']:.3f} ms/query  ({row['speedup']}x)")
+    with open(os.path.join(processed_dir, "ann_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
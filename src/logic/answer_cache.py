@@ -0,0 +1,62 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from logic.embed_cache import EmbeddingCache
+
+ANSWER_CACHE_TTL_SECONDS = 24 * 60 * 60
+ANSWER_CACHE_MAX_ENTRIES = 512
+
+class AnswerCache:
+    """
+    ♻️ GOVERNANCE ANSWER CACHE:
+    Temperature-0 answers keyed by (system-instruction version, normalized query,
+    hash of the assembled manuscript context). TTL + LRU bounded, and wiped
+    whenever the engine reports a different fabric version.
+    """
+    def __init__(self, ttl_seconds=ANSWER_CACHE_TTL_SECONDS, max_entries=ANSWER_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fabric_version = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(instructions_version, query, combined_xml):
+        context_hash = hashlib.sha256(combined_xml.encode("utf-8")).hexdigest()
+        raw = f"{instructions_version}\x00{EmbeddingCache.normalize(query)}\x00{context_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def sync_fabric_version(self, fabric_version):
+        """Drops every cached answer once the Knowledge Fabric has been re-indexed."""
+        with self._lock:
+            if fabric_version != self._fabric_version:
+                self._entries.clear()
+                self._fabric_version = fabric_version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["cached_at"] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = dict(entry, cached_at=time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,159 @@
+import os
+import time
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.telemetry import StageTimer
+from logic.graph import route_query
+from logic.resolver import render_lineage, GLOBAL_REGION
+
+CHAT_MODEL = "gpt-4o"
+GLOBAL_MASTER_QUERY = "Global Base Layer Master"
+# Optional cap on manuscript-context tokens per audit (unset = no trimming)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("AETHER_CONTEXT_TOKEN_BUDGET", "0")) or None
+
+# 🛡️ THE IDEAL RESPONSE SYSTEM INSTRUCTIONS
+SYSTEM_INSTRUCTIONS = """
+            You are the AETHER_VERITAS Thought Partner. 
+
+            ### THE IDEAL RESPONSE PROTOCOL:
+            1. CATEGORY LOCK: If the query is about 'Deductibles', stay strictly in that node. Do NOT mention Seismic, Environmental, or Mileage data.
+            2. SIBLING RULE: If a requested value (like 1000) is missing, find the values that DO exist in that same category. Tell me: "I don't see 1000, but I do see the 250 and 500 options available."
+            3. TRACEABILITY: If you pull from Global because Regional is blank, you MUST explicitly state you 'self-healed' the audit.
+            4. TONE: Professional but natural peer-to-peer conversation. "I've reviewed the manuscripts..." or "I noticed a gap..."
+            5. ESCALATION: If missing everywhere, state: "I am escalating a ticket for this data gap."
+
+            End with exactly 'RESULT: GOVERNED' or 'RESULT: DATA GAP DETECTED'.
+            """
+
+# Any edit to the instructions or model changes this, invalidating cached answers
+SYSTEM_INSTRUCTIONS_VERSION = hashlib.sha256(f"{CHAT_MODEL}\x00{SYSTEM_INSTRUCTIONS}".encode("utf-8")).hexdigest()[:12]
+
+def retrieve_contexts(engine, query, timings=None, region=None):
+    """
+    ⚡ CONCURRENT RETRIEVAL: The regional match and the Global master context are
+    independent, so both lookups run side by side instead of back to back.
+    The regional query goes through the LangGraph router (exact entity fast path or hybrid search).
+    Both lookups pin the same fabric snapshot, so a hot swap mid-audit cannot mix versions.
+    Returns (regional_result, global_result, fabric_version): each result a (status, score,
+    payload) tuple, and the version of the snapshot both came from (for caching and provenance).
+    `timings` receives the regional lookup's stages plus overall "retrieval" wall time.
+    `region` scopes the regional lookup to that overlay's lineage shards; the Global
+    master only ever searches the Global shard.
+    """
+    timer = StageTimer(timings)
+    snapshot = engine.pin_snapshot()
+    with timer.span("retrieval"), ThreadPoolExecutor(max_workers=2) as pool:
+        regional = pool.submit(route_query, engine, query, timings, region, snapshot)
+        global_master = pool.submit(engine.get_aether_result, GLOBAL_MASTER_QUERY, region=GLOBAL_REGION, snapshot=snapshot)
+        return regional.result(), global_master.result(), snapshot.version
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding():
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(CHAT_MODEL)
+    except Exception:
+        # tiktoken is optional (and fetches its tables on first use)
+        return None
+
+def count_tokens(text):
+    """Exact GPT-4o token count when tiktoken is available, ~4 characters per token otherwise."""
+    encoding = _token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+def trim_to_budget(regional_blocks, global_blocks, token_budget):
+    """
+    ✂️ TOKEN BUDGET: Drops the lowest-scoring lineage blocks (from either retrieval)
+    until the context fits. The primary regional block is always kept.
+    """
+    candidates = [("regional", i, b) for i, b in enumerate(regional_blocks)] + \
+                 [("global", i, b) for i, b in enumerate(global_blocks)]
+    total = sum(count_tokens(b["text"]) for _, _, b in candidates)
+    dropped = set()
+    for source, i, block in sorted(candidates, key=lambda c: c[2]["score"]):
+        if total <= token_budget:
+            break
+        if source == "regional" and i == 0:
+            continue
+        dropped.add((source, i))
+        total -= count_tokens(block["text"])
+    return ([b for i, b in enumerate(regional_blocks) if ("regional", i) not in dropped],
+            [b for i, b in enumerate(global_blocks) if ("global", i) not in dropped])
+
+def drop_covered_sections(blocks, seen):
+    """
+    Removes every section whose chunks are all in `seen`; a block left with no
+    sections is dropped, a partly covered one keeps only its new sections.
+    """
+    kept = []
+    for block in blocks:
+        sections = [s for s in block.get("sections", [block]) if not set(s["ids"]) <= seen]
+        if not sections:
+            continue
+        if len(sections) < len(block.get("sections", [block])):
+            block = dict(block, sections=sections,
+                         ids=[chunk_id for s in sections for chunk_id in s["ids"]],
+                         text="\n".join(s["text"] for s in sections))
+        kept.append(block)
+    return kept
+
+def build_combined_xml(result_payload, global_context, token_budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Regional lineage + Global master context for the prompt. Global blocks the regional
+    lineage already contains are dropped section by section (a Global parent the regional
+    lineage already self-healed is not sent twice), then the optional token budget is applied.
+    Escalated payloads carry no lineage blocks and pass through as their status line.
+    """
+    regional_blocks = result_payload['metadata'].get('lineage_blocks')
+    global_blocks = global_context['metadata'].get('lineage_blocks')
+    if regional_blocks is not None and global_blocks is not None:
+        seen = {chunk_id for block in regional_blocks for chunk_id in block["ids"]}
+        global_blocks = drop_covered_sections(global_blocks, seen)
+    if token_budget and regional_blocks and global_blocks is not None:
+        regional_blocks, global_blocks = trim_to_budget(regional_blocks, global_blocks, token_budget)
+
+    regional_xml = render_lineage(regional_blocks) if regional_blocks is not None else result_payload['metadata'].get('raw_xml', '')
+    if global_blocks is None:
+        global_xml = global_context['metadata'].get('raw_xml', '')
+    elif global_blocks:
+        global_xml = render_lineage(global_blocks)
+    else:
+        global_xml = "(already covered by the regional lineage above)"
+    return f"PRIMARY_MATCH (Regional): {regional_xml}\n\nGLOBAL_MASTER: {global_xml}"
+
+def build_messages(combined_xml, query):
+    return [{"role": "system", "content": SYSTEM_INSTRUCTIONS},
+            {"role": "user", "content": f"### MANUSCRIPT CONTEXT ###\n{combined_xml}\n\nQuery: {query}"}]
+
+def stream_audit_answer(client, combined_xml, query, timings=None):
+    """
+    Yields the GPT-4o answer token by token as it is generated.
+    `timings` receives "llm_first_token" and "llm" (full answer) milliseconds.
+    """
+    timer = StageTimer(timings)
+    start = time.perf_counter()
+    stream = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=build_messages(combined_xml, query),
+        temperature=0.0,
+        stream=True
+    )
+    first = True
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            if first:
+                timer.add("llm_first_token", (time.perf_counter() - start) * 1000)
+                first = False
+            yield chunk.choices[0].delta.content
+    timer.add("llm", (time.perf_counter() - start) * 1000)
+
+def classify_answer(answer):
+    """GOVERNED/ESCALATED status and self-heal flag, read off the finished answer."""
+    is_gap = "DATA GAP" in answer.upper()
+    status = "ESCALATED" if is_gap else "GOVERNED"
+    is_healed = "SELF-HEAL" in answer.upper() or "GLOBAL" in answer.upper()
+    return status, is_healed
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import argparse
+
+# 🛡️ CLOUD-RESILIENT PATH ANCHOR
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.resolver import AetherEngine
+
+BULK_BATCH_SIZE = 64
+
+def read_queries(path):
+    """Plain text (one query per line, '#' comments) or JSONL with a "query" field."""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                queries.append(json.loads(line)["query"])
+            else:
+                queries.append(line)
+    return queries
+
+def run_bulk_audit(engine, queries, output_path, threshold=0.25, batch_size=BULK_BATCH_SIZE, region=None):
+    """
+    🧾 HEADLESS BULK AUDIT: Batched retrieval over a query catalogue, one JSONL record
+    per query with status, score, primary entity and the assembled lineage.
+    `region` limits every query to that overlay's lineage shards.
+    """
+    counts = {}
+    with open(output_path, "w", encoding="utf-8") as out:
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            for query, (status, score, payload) in zip(batch, engine.get_aether_results(batch, threshold, region=region)):
+                m = payload.get("metadata", {})
+                record = {
+                    "query": query,
+                    "status": status,
+                    "score": round(float(score), 4),
+                    "id": payload.get("id"),
+                    "entity": m.get("name"),
+                    "region": m.get("region"),
+                    "lineage": m.get("raw_xml")
+                }
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                counts[status] = counts.get(status, 0) + 1
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AETHER_VERITAS bulk audit (no Streamlit).")
+    parser.add_argument("queries", help="Query file: .txt (one per line) or .jsonl with a 'query' field")
+    parser.add_argument("-o", "--output", default="bulk_audit.jsonl", help="JSONL results path")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Escalation confidence threshold")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="Queries per embedding request")
+    parser.add_argument("--region", help="Jurisdiction to audit (e.g. CA): searches its overlay lineage only")
+    args = parser.parse_args(argv)
+
+    queries = read_queries(args.queries)
+    print(f"🔎 Auditing {len(queries)} queries...")
+    counts = run_bulk_audit(AetherEngine(), queries, args.output, args.threshold, args.batch_size, args.region)
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"✅ Bulk audit complete ({summary}). Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import re
+import hashlib
+from types import SimpleNamespace
+import numpy as np
+import openai
+from openai import OpenAI
+import streamlit as st
+
+# 🛡️ Transient API failures worth retrying (rate limits, timeouts, 5xx)
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+LOCAL_EMBEDDING_DIM = 256
+
+def resolve_api_key():
+    """HF Secret Priority, falling back to the environment for headless runs."""
+    try:
+        api_key = st.secrets.get("OPENAI_API_KEY")
+    except Exception:
+        # No secrets.toml outside Streamlit (CLI, offline indexing)
+        api_key = None
+    return api_key or os.getenv("OPENAI_API_KEY")
+
+def local_embedding_model(dim=LOCAL_EMBEDDING_DIM):
+    """Model id the local stand-in files its vectors under: never mistaken for OpenAI's."""
+    return f"local-hash-{dim}"
+
+def embedding_model(client):
+    """Effective embedding model of a client: keys manifests, checkpoints and the query cache."""
+    return getattr(client, "embedding_model", EMBEDDING_MODEL)
+
+def use_local_backend():
+    return os.getenv("AETHER_BACKEND", "").lower() == "local"
+
+class LocalEmbeddings:
+    """
+    Deterministic stand-in for `client.embeddings`.
+    Feature-hashed bag of words: identical text gives identical vectors and
+    texts sharing terms land close together, so retrieval still behaves sensibly offline.
+    """
+    def __init__(self, dim=LOCAL_EMBEDDING_DIM):
+        self.dim = dim
+        self.calls = 0
+
+    def _embed(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            slot = int.from_bytes(digest[:4], "little") % self.dim
+            vec[slot] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            vec[0], norm = 1.0, 1.0
+        return (vec / norm).tolist()
+
+    def create(self, input, model):
+        self.calls += 1
+        texts = [input] if isinstance(input, str) else list(input)
+        data = [SimpleNamespace(embedding=self._embed(t), index=i) for i, t in enumerate(texts)]
+        return SimpleNamespace(data=data, model=model)
+
+class LocalCompletions:
+    """
+    Deterministic stand-in for `client.chat.completions`.
+    Answers from the manuscript context alone: escalates when retrieval reported a
+    gap, otherwise governs (mentioning self-healing when Global lineage was used).
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def _answer(self, messages):
+        context = messages[-1]["content"]
+        if "Data Gap Found" in context.split("GLOBAL_MASTER")[0]:
+            return "I noticed a gap: no layer defines this. I am escalating a ticket for this data gap.\n\nRESULT: DATA GAP DETECTED"
+        healed = " I self-healed the audit from the Global layer." if "Self-Healed" in context else ""
+        return f"I've reviewed the manuscripts and the requested logic is defined.{healed}\n\nRESULT: GOVERNED"
+
+    def create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        answer = self._answer(messages)
+        if not stream:
+            message = SimpleNamespace(role="assistant", content=answer)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, index=0)], model=model)
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token), index=0)], model=model)
+            for token in re.findall(r"\S+\s*", answer)
+        )
+
+class LocalClient:
+    """Offline stand-in for `OpenAI()` exposing `.embeddings.create` and `.chat.completions.create`."""
+    def __init__(self, dim=LOCAL_EMBEDDING_DIM):
+        self.embedding_model = local_embedding_model(dim)
+        self.embeddings = LocalEmbeddings(dim)
+        self.chat = SimpleNamespace(completions=LocalCompletions())
+
+def build_client():
+    """OpenAI by default; the local stand-in when AETHER_BACKEND=local."""
+    if use_local_backend():
+        return LocalClient()
+    return OpenAI(api_key=resolve_api_key())
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+EMBED_CACHE_MAX_ENTRIES = 2048
+# Optional on-disk tier (SQLite). Unset = memory only.
+EMBED_CACHE_PATH = os.getenv("AETHER_EMBED_CACHE_PATH")
+
+class EmbeddingCache:
+    """
+    ⚡ QUERY EMBEDDING CACHE:
+    Bounded LRU keyed by (model, normalized text), optionally backed by SQLite so
+    vectors survive restarts and are shared by every worker on the host.
+    """
+    def __init__(self, max_entries=EMBED_CACHE_MAX_ENTRIES, persist_path=EMBED_CACHE_PATH):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if persist_path:
+            os.makedirs(os.path.dirname(os.path.abspath(persist_path)), exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def normalize(text):
+        """Case and whitespace differences should not cost a network round-trip."""
+        return " ".join(text.split()).casefold()
+
+    @classmethod
+    def _key(cls, text, model):
+        return hashlib.sha256(f"{model}\x00{cls.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, text, model):
+        key = self._key(text, model)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text, model, vector):
+        key = self._key(text, model)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, vector.tobytes()))
+                self._db.commit()
+
+    def get_or_embed(self, texts, model, embed_fn):
+        """
+        Vectors for `texts` in order. Misses (deduplicated) go to `embed_fn`
+        in a single call; `embed_fn(list_of_texts) -> list_of_vectors`.
+        """
+        vectors = [self.get(text, model) for text in texts]
+        missing = OrderedDict()  # normalized -> first original spelling
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                missing.setdefault(self.normalize(text), text)
+        if missing:
+            fresh = dict(zip(missing, embed_fn(list(missing.values()))))
+            for normalized, text in missing.items():
+                self.put(text, model, fresh[normalized])
+            vectors = [v if v is not None else np.asarray(fresh[self.normalize(t)], dtype=np.float32)
+                       for t, v in zip(texts, vectors)]
+        return vectors
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
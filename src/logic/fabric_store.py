@@ -0,0 +1,91 @@
+import os
+import mmap
+import shutil
+import numpy as np
+
+METADATA_DIRNAME = "metadata"
+COLUMNS = ("id", "region", "name", "tag", "inheritsFrom")
+RAW_XML_BLOB = "raw_xml.bin"
+RAW_XML_OFFSETS = "raw_xml_offsets.npy"
+
+def _fixed_width(values):
+    """Fixed-width unicode array: memory-mappable, no per-row Python objects."""
+    width = max([len(v) for v in values] + [1])
+    return np.array(values, dtype=f"<U{width}")
+
+def write_fabric_store(directory, chunks):
+    """
+    📦 COMPACT LOGIC MAP: One .npy per fixed column plus a single UTF-8 blob of raw XML
+    addressed by an offsets array. Written to a temp dir and moved into place.
+    """
+    tmp_dir = f"{directory}.tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    for column in COLUMNS:
+        if column == "id":
+            values = [c['id'] for c in chunks]
+        else:
+            values = [c['metadata'].get(column) or "" for c in chunks]
+        np.save(os.path.join(tmp_dir, f"{column}.npy"), _fixed_width(values))
+
+    offsets = [0]
+    with open(os.path.join(tmp_dir, RAW_XML_BLOB), "wb") as f:
+        for c in chunks:
+            encoded = (c['metadata'].get('raw_xml') or "").encode("utf-8")
+            f.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    np.save(os.path.join(tmp_dir, RAW_XML_OFFSETS), np.array(offsets, dtype=np.int64))
+
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+class FabricStore:
+    """
+    Read side of the compact logic map. Columns are memory-mapped and raw XML is
+    decoded only for the rows a query actually touches, so cold start and resident
+    memory no longer scale with manuscript size.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._columns = {
+            column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode='r')
+            for column in COLUMNS
+        }
+        self._offsets = np.load(os.path.join(directory, RAW_XML_OFFSETS), mmap_mode='r')
+
+        blob_path = os.path.join(directory, RAW_XML_BLOB)
+        self._blob = b""
+        if os.path.getsize(blob_path) > 0:
+            with open(blob_path, "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, RAW_XML_OFFSETS))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def column(self, column):
+        """Whole column as Python strings (e.g. to build lookup indexes)."""
+        return self._columns[column].tolist()
+
+    def field(self, row, column):
+        value = str(self._columns[column][row])
+        return value or None
+
+    def raw_xml(self, row):
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def metadata(self, row):
+        """Same shape as the legacy metadata.json entries."""
+        m = {column: self.field(row, column) for column in COLUMNS if column != "id"}
+        m['raw_xml'] = self.raw_xml(row)
+        return m
+
+    def __getitem__(self, row):
+        return {"id": self.field(row, "id"), "metadata": self.metadata(row)}
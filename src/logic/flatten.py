@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import copy
+import mmap
+import shutil
+import numpy as np
+import lxml.etree as ET
+
+FLAT_DIRNAME = "flat"
+FLAT_XML_BLOB = "flat_xml.bin"
+FLAT_XML_OFFSETS = "flat_xml_offsets.npy"
+FLAT_LABELS_BLOB = "flat_labels.bin"
+FLAT_LABELS_OFFSETS = "flat_labels_offsets.npy"
+FLAT_META = "flat_meta.json"
+# Bumped whenever the merge rules change, so views built under older rules are ignored
+FLAT_FORMAT = 2
+
+_INTER_TAG_WHITESPACE = re.compile(r">\s+<")
+
+class AmbiguousMerge(ValueError):
+    """Raised when overlay children cannot be lined up with their ancestor's unambiguously."""
+
+def minify_xml(xml):
+    """Drops pretty-print indentation between tags; text content and attribute values are untouched."""
+    return _INTER_TAG_WHITESPACE.sub("><", (xml or "").strip())
+
+def layer_label(region):
+    return "GLOBAL_BASE" if region == "GLOBAL" else f"{region}_OVERLAY"
+
+def _child_key(child):
+    """
+    Identity of a child across layers: (tag, name/id). Unnamed children are keyed by
+    tag alone: an overlay's <Multiplier value="0.85"/> replaces every unnamed Global Multiplier.
+    """
+    for attr in ("name", "id"):
+        if child.get(attr) is not None:
+            return child.tag, child.get(attr)
+    return child.tag, None
+
+def _keyed_children(element):
+    """[(key, child)] for one layer; duplicate names or named + unnamed siblings of one tag are ambiguous."""
+    keyed = [(_child_key(c), c) for c in element if isinstance(c.tag, str)]
+    named = [key for key, _ in keyed if key[1] is not None]
+    if len(named) != len(set(named)):
+        raise AmbiguousMerge(f"duplicate child identity in <{element.tag}>")
+    unnamed_tags = {key[0] for key, _ in keyed if key[1] is None}
+    if any(tag in unnamed_tags for tag, _ in named):
+        raise AmbiguousMerge(f"named and unnamed <{sorted(unnamed_tags)[0]}> siblings in <{element.tag}>")
+    return keyed
+
+def _describe(key):
+    tag, ident = key
+    return f"{tag}[{ident}]" if ident is not None else tag
+
+def _merge_children(merged, keyed):
+    """Applies one overlay layer's children onto the merged element; returns the keys it set."""
+    existing = _keyed_children(merged)
+    existing_keys = {key for key, _ in existing}
+    applied = []
+    for key, child in keyed:
+        tag, ident = key
+        if ident is not None:
+            if (tag, None) in existing_keys:
+                raise AmbiguousMerge(f"named <{tag}> over unnamed ancestor <{tag}>")
+            current = next((c for k, c in existing if k == key), None)
+            if current is not None:
+                merged.replace(current, copy.deepcopy(child))
+            else:
+                merged.append(copy.deepcopy(child))
+        elif (tag, None) not in applied:
+            if any(k[0] == tag and k[1] is not None for k in existing_keys):
+                raise AmbiguousMerge(f"unnamed <{tag}> over named ancestor <{tag}>")
+            # The overlay's unnamed children of this tag replace the ancestor's as a group, in place
+            removed = [c for k, c in existing if k == key]
+            position = merged.index(removed[0]) if removed else len(merged)
+            for old in removed:
+                merged.remove(old)
+            for offset, new in enumerate(c for k, c in keyed if k == key):
+                merged.insert(position + offset, copy.deepcopy(new))
+        applied.append(key)
+    return applied
+
+def flatten_lineage(layers):
+    """
+    🧬 FLATTENED VIEW: Folds a lineage into one element, nearest layer winning.
+    `layers` is [(REGION, raw_xml)] farthest ancestor first, the node itself last.
+    Children line up by (tag, name/id); an overlay's unnamed children of a tag replace
+    all of the ancestor's unnamed children of that tag. Raises AmbiguousMerge when that
+    cannot be decided, so the caller serves the parent + child pair instead.
+    Returns (merged_xml, inherited) where `inherited` names every attribute/child the
+    node takes from an ancestor, e.g. ["@limit <- GLOBAL_BASE", "Deductible[base] <- GLOBAL_BASE"].
+    """
+    merged, attr_origin, child_origin = None, {}, {}
+    for region, raw_xml in layers:
+        element = ET.fromstring(raw_xml)
+        keyed = _keyed_children(element)
+        if merged is None:
+            merged = element
+            attr_origin = {k: region for k in element.attrib}
+            child_origin = {key: region for key, _ in keyed}
+            continue
+        for k, v in element.attrib.items():
+            merged.set(k, v)
+            attr_origin[k] = region
+        if (element.text or "").strip():
+            merged.text = element.text
+        for key in _merge_children(merged, keyed):
+            child_origin[key] = region
+        merged.tag = element.tag
+
+    # The flattened node no longer inherits from anything
+    merged.attrib.pop("inheritsFrom", None)
+    attr_origin.pop("inheritsFrom", None)
+
+    own_region = layers[-1][0]
+    inherited = [f"@{k} <- {layer_label(r)}" for k, r in attr_origin.items() if r != own_region]
+    inherited += [f"{_describe(key)} <- {layer_label(r)}" for key, r in child_origin.items() if r != own_region]
+    return minify_xml(ET.tostring(merged, encoding='unicode')), inherited
+
+def _write_blob(path, texts):
+    """Concatenated UTF-8 texts; returns the int64 offsets (len(texts) + 1) that delimit them."""
+    offsets = [0]
+    with open(path, "wb") as f:
+        for text in texts:
+            encoded = text.encode("utf-8")
+            f.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    return np.array(offsets, dtype=np.int64)
+
+def _map_blob(path):
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def write_flat_views(directory, snapshot, key=None):
+    """
+    Index-time flattening of every node in shard `key` that inherits: one blob of merged
+    XML plus a provenance label per row (empty for nodes with no lineage). Ancestors may
+    live in other shards; the region hierarchy it was built for is stored alongside, so
+    an engine configured differently ignores it.
+    """
+    tmp_dir = f"{directory}.tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    merged_views, labels = [], []
+    for row in range(snapshot.shard_rows[key]):
+        ref = (key, row)
+        merged, label = "", ""
+        chain = snapshot.inheritance_chain(ref)
+        if chain:
+            refs = list(reversed(chain)) + [ref]
+            layers = [((snapshot.field(r, 'region') or '').upper(), snapshot.raw_xml(r)) for r in refs]
+            try:
+                merged, inherited = flatten_lineage(layers)
+                lineage = " over ".join(layer_label(region) for region, _ in reversed(layers))
+                label = f"Flattened: {lineage}"
+                if inherited:
+                    label += f" | Self-Healed: {', '.join(inherited)}"
+            except (ET.XMLSyntaxError, AmbiguousMerge):
+                # No flat view: the engine serves the parent + child pair for this row
+                merged, label = "", ""
+        merged_views.append(merged)
+        labels.append(label)
+
+    np.save(os.path.join(tmp_dir, FLAT_XML_OFFSETS), _write_blob(os.path.join(tmp_dir, FLAT_XML_BLOB), merged_views))
+    # Labels vary from empty to long "Self-Healed: ..." lists: blob + offsets, not fixed-width rows
+    np.save(os.path.join(tmp_dir, FLAT_LABELS_OFFSETS), _write_blob(os.path.join(tmp_dir, FLAT_LABELS_BLOB), labels))
+    with open(os.path.join(tmp_dir, FLAT_META), "w") as f:
+        json.dump({"format": FLAT_FORMAT, "region_parents": snapshot.region_parents}, f, sort_keys=True)
+
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+class FlatViews:
+    """Read side: memory-mapped offsets, merged XML and labels decoded per served row."""
+    def __init__(self, directory):
+        self._offsets = np.load(os.path.join(directory, FLAT_XML_OFFSETS), mmap_mode='r')
+        self._blob = _map_blob(os.path.join(directory, FLAT_XML_BLOB))
+        self._label_offsets = np.load(os.path.join(directory, FLAT_LABELS_OFFSETS), mmap_mode='r')
+        self._labels = _map_blob(os.path.join(directory, FLAT_LABELS_BLOB))
+
+    @staticmethod
+    def load(directory, region_parents):
+        """None when absent, built under older merge rules or for a different region hierarchy than the engine's."""
+        meta_path = os.path.join(directory, FLAT_META)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("format") != FLAT_FORMAT or meta.get("region_parents") != region_parents:
+            return None
+        return FlatViews(directory)
+
+    def get(self, row):
+        """(merged_xml, provenance_label) for a node with lineage, else None."""
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        if start == end:
+            return None
+        label_start, label_end = int(self._label_offsets[row]), int(self._label_offsets[row + 1])
+        return self._blob[start:end].decode("utf-8"), self._labels[label_start:label_end].decode("utf-8")
@@ -1,33 +1,78 @@
-from typing import TypedDict, Annotated, List
+import operator
+from typing import TypedDict, Annotated, List, Any
 from langgraph.graph import StateGraph, END
 
 class AgentState(TypedDict):
     query: str
     resolved_logic: str
     source: str
-    audit_trail: List[str]
+    status: str
+    score: float
+    result: Any
+    lexical_match: Any
+    audit_trail: Annotated[List[str], operator.add]
+
+# The engine, optional timings dict, region scope and pinned snapshot travel in config["configurable"], not in state
+def _configurable(config):
+    return (config or {}).get("configurable", {})
+
+def entity_lookup(state: AgentState, config):
+    # One exact-entity scan per query; xml_resolver reuses its (snapshot, refs) from state
+    cfg = _configurable(config)
+    match = cfg["engine"].lexical_match(state['query'], timings=cfg.get("timings"), region=cfg.get("region"),
+                                        snapshot=cfg.get("snapshot"))
+    return {"lexical_match": match}
 
 def intent_router(state: AgentState):
-    # In a real app, an LLM would decide. Here we use logic-based routing.
-    if any(word in state['query'].lower() for word in ["calculate", "formula", "xml"]):
-        return "xml_resolver"
-    return "semantic_search"
+    # Deterministic routing: a query that names a logic node outright skips the embedding round-trip
+    _, refs = state['lexical_match']
+    return "xml_resolver" if refs else "semantic_search"
 
-def xml_node(state: AgentState):
-    # Logic to call AetherEngine.resolve_inheritance
-    return {"audit_trail": ["Action: XML_Deterministic_Lookup"]}
+def _node_update(result, action, source):
+    status, score, payload = result
+    return {
+        "status": status,
+        "score": score,
+        "result": result,
+        "resolved_logic": payload['metadata'].get('raw_xml', ''),
+        "source": source,
+        "audit_trail": [action]
+    }
 
-def semantic_node(state: AgentState):
-    # Logic to call AetherEngine.semantic_search
-    return {"audit_trail": ["Action: ChromaDB_Semantic_Search"]}
+def xml_node(state: AgentState, config):
+    # Exact entity hit: AetherEngine serves the node + its inheritance chain from the lexical index
+    cfg = _configurable(config)
+    result = cfg["engine"].get_lexical_result(state['query'], timings=cfg.get("timings"), region=cfg.get("region"),
+                                              match=state['lexical_match'])
+    return _node_update(result, "Action: XML_Deterministic_Lookup", "lexical")
+
+def semantic_node(state: AgentState, config):
+    # Vector + BM25 candidates fused by reciprocal rank
+    cfg = _configurable(config)
+    result = cfg["engine"].get_aether_result(state['query'], timings=cfg.get("timings"), region=cfg.get("region"),
+                                             snapshot=cfg.get("snapshot"))
+    return _node_update(result, "Action: Hybrid_Semantic_Search", "hybrid")
 
 # Build the Graph
 workflow = StateGraph(AgentState)
+workflow.add_node("entity_lookup", entity_lookup)
 workflow.add_node("xml_resolver", xml_node)
 workflow.add_node("semantic_search", semantic_node)
 
-workflow.set_entry_point("xml_resolver") # Simplified for demo
+workflow.set_entry_point("entity_lookup")
+workflow.add_conditional_edges("entity_lookup", intent_router, {"xml_resolver": "xml_resolver", "semantic_search": "semantic_search"})
 workflow.add_edge("xml_resolver", END)
 workflow.add_edge("semantic_search", END)
 
-compiled_graph = workflow.compile()
\ No newline at end of file
+compiled_graph = workflow.compile()
+
+def route_query(engine, query, timings=None, region=None, snapshot=None):
+    """
+    Runs one query through the router graph. Returns (status, score, payload) like get_aether_result.
+    `region` scopes both routes to that overlay's lineage shards (None = whole fabric);
+    `snapshot` pins both routes to one engine.pin_snapshot() result.
+    """
+    state = compiled_graph.invoke({"query": query, "audit_trail": []},
+                                  config={"configurable": {"engine": engine, "timings": timings, "region": region,
+                                                           "snapshot": snapshot}})
+    return state["result"]
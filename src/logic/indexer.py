@@ -1,9 +1,14 @@
 import os
+import sys
 import json
+import time
+import random
+import shutil
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import numpy as np
 import lxml.etree as ET
-from openai import OpenAI
-import streamlit as st
 
 # 🛡️ CLOUD-RESILIENT PATH ANCHOR
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,17 +16,166 @@ if "logic" in BASE_DIR:
     PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
 else:
     PROJECT_ROOT = BASE_DIR
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.clients import build_client, embedding_model, RETRYABLE_ERRORS
+from logic.vector_store import normalize_rows
+from logic.ann import IVFIndex, ANN_DIRNAME, ANN_MIN_VECTORS
+from logic.fabric_store import write_fabric_store, METADATA_DIRNAME
+from logic.lexical import write_lexical_index, LEXICAL_DIRNAME
+from logic.snapshots import fabric_dir, snapshot_path, staging_path, publish_snapshot, shard_path, read_shard_index, SHARD_INDEX
+from logic.flatten import write_flat_views, FLAT_DIRNAME, FLAT_FORMAT
+from logic.resolver import FabricSnapshot, REGION_PARENTS
+
+EMBEDDING_BATCH_SIZE = 256   # well under the per-request input limit
+EMBEDDING_MAX_WORKERS = 4
+EMBEDDING_MAX_RETRIES = 5
+
+# 🛠️ FULL SCOPE XPATH: Captures nested RiskFactors and standalone Forms
+CHUNK_XPATH = ".//Coverage | .//Factor | .//RiskFactors/* | .//Governance_Rules | .//FormMasterList | .//Form"
+CHUNK_TAGS = {"Coverage", "Factor", "Governance_Rules", "FormMasterList", "Form"}
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024   # iterparse anything larger than this
+PARSE_MAX_WORKERS = os.cpu_count() or 1
+# Worker start-up re-imports the whole stack: small syncs parse faster in-process
+PARALLEL_PARSE_THRESHOLD_BYTES = 20 * 1024 * 1024
+PARALLEL_PARSE_MIN_FILES = 8
+# Never fork: the indexer also runs on a thread inside the multi-threaded Streamlit server,
+# and a forked child can inherit a lock some other thread held mid-acquire
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def _is_chunk_node(node):
+    """Streaming equivalent of CHUNK_XPATH for a single element."""
+    if node.tag in CHUNK_TAGS:
+        return True
+    parent = node.getparent()
+    return parent is not None and parent.tag == "RiskFactors"
+
+def _build_chunk(node, region, semantic_bridge):
+    # Capture identity: check name, then id, then the tag name itself
+    name = node.get('name', node.get('id', node.tag))
+    inherits = node.get('inheritsFrom')
+    raw_xml = ET.tostring(node, encoding='unicode', pretty_print=True, with_tail=False)
+    
+    # Map technical names to human intent via the bridge
+    lookup_key = f"{region}_{name}" if f"{region}_{name}" in semantic_bridge else name
+    synonyms = semantic_bridge.get(lookup_key, "Insurance Logic Component")
+    
+    # 🛡️ SENTINEL ENHANCEMENT: Explicit meta-tagging for retrieval accuracy
+    searchable_text = f"REGION: {region} | ID: {name} | TAG: {node.tag} | INTENT: {synonyms}"
+    
+    return {
+        "id": f"{region}_{name}_{node.tag}", # Added tag to ID to prevent collisions
+        "text": searchable_text, 
+        "metadata": {
+            "region": region, 
+            "name": name, 
+            "tag": node.tag,
+            "inheritsFrom": inherits, # Explicitly capture inheritance for Resolver
+            "raw_xml": raw_xml 
+        }
+    }
+
+def _iter_chunks_streaming(file_path, region, semantic_bridge):
+    """
+    🌊 STREAMING INGESTION: Builds chunks as their closing tag is parsed and frees
+    every finished subtree, so memory stays bounded by the largest single chunk.
+    Chunks are numbered at their opening tag and yielded in that order, so a container
+    still precedes its nested chunks exactly as CHUNK_XPATH (document order) returns them.
+    """
+    open_ordinals, finished = [], {}
+    started = emitted = 0
+    for event, node in ET.iterparse(file_path, events=("start", "end"), huge_tree=True):
+        if event == "start":
+            if _is_chunk_node(node):
+                open_ordinals.append(started)
+                started += 1
+            continue
+
+        if _is_chunk_node(node):
+            finished[open_ordinals.pop()] = _build_chunk(node, region, semantic_bridge)
+            # Children close before their container: hold them until it is emitted
+            while emitted in finished:
+                yield finished.pop(emitted)
+                emitted += 1
+
+        # Only drop subtrees no enclosing chunk still needs for its raw_xml
+        if not open_ordinals:
+            node.clear(keep_tail=True)
+            parent = node.getparent()
+            while parent is not None and node.getprevious() is not None:
+                del parent[0]
+
+def _chunk_manuscript(file_path, region, semantic_bridge, streaming=None):
+    """Module-level so ProcessPoolExecutor can ship it to worker processes."""
+    if not os.path.exists(file_path):
+        print(f"❌ Manuscript not found at: {file_path}")
+        return []
+
+    if streaming is None:
+        streaming = os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
+    if streaming:
+        return list(_iter_chunks_streaming(file_path, region, semantic_bridge))
+
+    tree = ET.parse(file_path)
+    return [_build_chunk(node, region, semantic_bridge) for node in tree.xpath(CHUNK_XPATH)]
+
+def discover_manuscripts(manuscripts_dir):
+    """
+    Maps every manuscript in the folder to its region:
+    global*.xml -> Global, <region>_overlay.xml -> REGION, anything else -> FILENAME.
+    Global is always listed first.
+    """
+    if not os.path.isdir(manuscripts_dir):
+        return {}
+
+    found = {}
+    for file_name in sorted(os.listdir(manuscripts_dir)):
+        stem, ext = os.path.splitext(file_name)
+        if ext.lower() != ".xml":
+            continue
+        if stem.lower().startswith("global"):
+            region = "Global"
+        elif stem.lower().endswith("_overlay"):
+            region = stem[:-len("_overlay")].upper()
+        else:
+            region = stem.upper()
+        if region in found:
+            print(f"⚠️ Skipping {file_name}: region {region} already provided by {os.path.basename(found[region])}")
+            continue
+        found[region] = os.path.join(manuscripts_dir, file_name)
+
+    ordered = {"Global": found.pop("Global")} if "Global" in found else {}
+    ordered.update(found)
+    return ordered
 
 class AetherIndexer:
-    def __init__(self):
-        # 🛡️ HF Secret Priority
-        api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, client=None, batch_size=EMBEDDING_BATCH_SIZE,
+                 max_workers=EMBEDDING_MAX_WORKERS, max_retries=EMBEDDING_MAX_RETRIES,
+                 parse_workers=PARSE_MAX_WORKERS, build_ann=None, ann_lists=None, data_dir=None, progress=None,
+                 region_parents=None):
+        # 🛡️ HF Secret Priority (or the local stand-in when AETHER_BACKEND=local)
+        self.client = client or build_client()
+        # Local stand-in vectors are filed under their own model id, never OpenAI's
+        self.embedding_model = embedding_model(self.client)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.parse_workers = parse_workers
+        # build_ann=None: only build the ANN index once the fabric is big enough to need it
+        self.build_ann = build_ann
+        self.ann_lists = ann_lists
+        # Optional progress(phase, **counts) callback, e.g. the background provisioner's status file
+        self.progress = progress
+        # Overlay hierarchy the flattened views are merged along (must match the engine's)
+        self.region_parents = {k.upper(): v.upper() for k, v in (region_parents or REGION_PARENTS).items()}
         
         # Absolute paths for data synchronization
-        self.data_processed_dir = os.path.join(PROJECT_ROOT, "data", "processed")
-        self.metadata_path = os.path.join(self.data_processed_dir, "metadata.json")
-        self.vectors_path = os.path.join(self.data_processed_dir, "vectors.npy")
+        data_dir = data_dir or os.path.join(PROJECT_ROOT, "data")
+        self.manuscripts_dir = os.path.join(data_dir, "manuscripts")
+        self.data_processed_dir = os.path.join(data_dir, "processed")
+        self.checkpoint_dir = os.path.join(self.data_processed_dir, "embed_checkpoints")
         
         # REFINED Semantic Bridge: Strengthening Form & Multi-Factor links
         self.semantic_bridge = {
@@ -38,70 +192,309 @@ class AetherIndexer:
             "Pet_Rider": "domestic animal coverage, dog injury protection, cat rider"
         }
 
-    def chunk_xml(self, file_path, region):
-        if not os.path.exists(file_path):
-            print(f"❌ Manuscript not found at: {file_path}")
-            return []
-        
-        tree = ET.parse(file_path)
-        chunks = []
-        
-        # 🛠️ FULL SCOPE XPATH: Captures nested RiskFactors and standalone Forms
-        query = ".//Coverage | .//Factor | .//RiskFactors/* | .//Governance_Rules | .//FormMasterList | .//Form"
-        
-        for node in tree.xpath(query):
-            # Capture identity: check name, then id, then the tag name itself
-            name = node.get('name', node.get('id', node.tag))
-            inherits = node.get('inheritsFrom')
-            raw_xml = ET.tostring(node, encoding='unicode', pretty_print=True)
-            
-            # Map technical names to human intent via the bridge
-            lookup_key = f"{region}_{name}" if f"{region}_{name}" in self.semantic_bridge else name
-            synonyms = self.semantic_bridge.get(lookup_key, "Insurance Logic Component")
-            
-            # 🛡️ SENTINEL ENHANCEMENT: Explicit meta-tagging for retrieval accuracy
-            searchable_text = f"REGION: {region} | ID: {name} | TAG: {node.tag} | INTENT: {synonyms}"
-            
-            chunks.append({
-                "id": f"{region}_{name}_{node.tag}", # Added tag to ID to prevent collisions
-                "text": searchable_text, 
-                "metadata": {
-                    "region": region, 
-                    "name": name, 
-                    "tag": node.tag,
-                    "inheritsFrom": inherits, # Explicitly capture inheritance for Resolver
-                    "raw_xml": raw_xml 
-                }
-            })
-        return chunks
+    def chunk_xml(self, file_path, region, streaming=None):
+        """
+        Splits one manuscript into logic chunks.
+        streaming=None picks iterparse automatically for very large files.
+        """
+        return _chunk_manuscript(file_path, region, self.semantic_bridge, streaming)
 
-    def run_indexing_pipeline(self):
-        files_config = {
-            "Global": os.path.join(PROJECT_ROOT, "data", "manuscripts", "global_base.xml"), 
-            "CA": os.path.join(PROJECT_ROOT, "data", "manuscripts", "ca_overlay.xml")
-        }
-        
-        all_chunks = []
-        for region, path in files_config.items():
+    def _report(self, phase, **counts):
+        if self.progress is not None:
+            self.progress(phase, **counts)
+
+    def _parse_workers(self, files_config):
+        """Process-pool size: 1 (parse in-process) unless the manuscripts are big or numerous enough to pay for it."""
+        total_bytes = sum(os.path.getsize(path) for path in files_config.values() if os.path.exists(path))
+        if total_bytes < PARALLEL_PARSE_THRESHOLD_BYTES and len(files_config) < PARALLEL_PARSE_MIN_FILES:
+            return 1
+        return min(self.parse_workers, len(files_config))
+
+    def collect_chunks(self, files_config):
+        """Parses every manuscript, fanning out over a process pool when there are many or large ones."""
+        for region in files_config:
             print(f"🔎 Ingesting {region} layer...")
-            all_chunks.extend(self.chunk_xml(path, region))
+
+        total = len(files_config)
+        self._report("parsing", files_parsed=0, files_total=total)
+        per_file = []
+        workers = self._parse_workers(files_config)
+        if workers <= 1:
+            for region, path in files_config.items():
+                per_file.append(self.chunk_xml(path, region))
+                self._report("parsing", files_parsed=len(per_file), files_total=total)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(PARSE_START_METHOD)) as pool:
+                for chunks in pool.map(
+                    _chunk_manuscript,
+                    files_config.values(),
+                    files_config.keys(),
+                    [self.semantic_bridge] * total
+                ):
+                    per_file.append(chunks)
+                    self._report("parsing", files_parsed=len(per_file), files_total=total)
+
+        all_chunks = []
+        for chunks in per_file:
+            all_chunks.extend(chunks)
+        return all_chunks
+
+    @staticmethod
+    def _chunk_hash(chunk):
+        """Content fingerprint of everything a chunk contributes to the fabric."""
+        m = chunk['metadata']
+        payload = json.dumps([chunk['text'], m.get('tag'), m.get('inheritsFrom'), m.get('raw_xml')])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _dedupe_ids(chunks):
+        """Suffixes repeated chunk IDs so every manifest entry maps to exactly one row."""
+        seen = {}
+        for chunk in chunks:
+            base_id = chunk['id']
+            seen[base_id] = seen.get(base_id, 0) + 1
+            if seen[base_id] > 1:
+                chunk['id'] = f"{base_id}_{seen[base_id]}"
+
+    @staticmethod
+    def shard_key(chunk):
+        """Fabric shard a chunk is stored in: its region, upper-cased (Global -> GLOBAL)."""
+        return (chunk['metadata'].get('region') or 'Unknown').upper()
+
+    def _load_previous_fabric(self):
+        """
+        🛡️ INCREMENTAL SYNC: Returns the live snapshot's manifest entries, its vector rows
+        per shard ({None: rows} for a pre-sharding fabric), the region hierarchy it was
+        flattened for (None if flattened under older merge rules) and whether it is sharded.
+        Anything inconsistent (missing files, other model, row mismatch) forces a full rebuild.
+        """
+        current_dir = fabric_dir(self.data_processed_dir)
+        manifest_path = os.path.join(current_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return {}, {}, None, False
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("model") != self.embedding_model:
+            return {}, {}, None, False
+
+        shard_rows = read_shard_index(current_dir)
+        if shard_rows is None:
+            vector_paths = {None: os.path.join(current_dir, "vectors.npy")}
+        else:
+            vector_paths = {key: os.path.join(shard_path(current_dir, key), "vectors.npy") for key in shard_rows}
+        if not all(os.path.exists(path) for path in vector_paths.values()):
+            return {}, {}, None, False
+
+        vectors = {key: np.load(path) for key, path in vector_paths.items()}
+        entries = manifest.get("chunks", {})
+        for e in entries.values():
+            shard_vectors = vectors.get(e.get("shard"))
+            if shard_vectors is None or e.get("row", -1) >= len(shard_vectors):
+                return {}, {}, None, False
+        region_parents = manifest.get("region_parents") if manifest.get("flat_format") == FLAT_FORMAT else None
+        return entries, vectors, region_parents, shard_rows is not None
+
+    def _embed_batch(self, texts):
+        """Single embeddings call with exponential backoff on transient failures."""
+        for attempt in range(self.max_retries):
+            try:
+                response = self.client.embeddings.create(input=texts, model=self.embedding_model)
+                return np.array([data.embedding for data in response.data])
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                delay = min(2 ** attempt, 30) + random.uniform(0, 0.5)
+                print(f"⏳ Embedding batch failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _checkpoint_path(self, texts):
+        digest = hashlib.sha256(json.dumps([self.embedding_model, texts]).encode("utf-8")).hexdigest()
+        return os.path.join(self.checkpoint_dir, f"{digest}.npy")
+
+    def _embed_and_checkpoint(self, texts, path):
+        vectors = self._embed_batch(texts)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp_path, path)
+        return vectors
+
+    def embed_texts(self, texts):
+        """
+        🛡️ RESUMABLE EMBEDDING: Splits texts into batches, fans them out over a bounded
+        thread pool and checkpoints every finished batch, so an interrupted run
+        only re-embeds the batches that never completed.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = [None] * len(batches)
+        todo = []
+        for b, batch in enumerate(batches):
+            path = self._checkpoint_path(batch)
+            if os.path.exists(path):
+                results[b] = np.load(path)
+            else:
+                todo.append((b, batch, path))
+
+        if len(todo) < len(batches):
+            print(f"♻️ Resuming: {len(batches) - len(todo)}/{len(batches)} batches restored from checkpoint")
+
+        embedded = sum(len(r) for r in results if r is not None)
+        self._report("embedding", chunks_embedded=embedded, chunks_total=len(texts))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._embed_and_checkpoint, batch, path): b for b, batch, path in todo}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                embedded += len(batches[futures[future]])
+                print(f"🧮 Embedded batch {done}/{len(todo)}")
+                self._report("embedding", chunks_embedded=embedded, chunks_total=len(texts))
+
+        return np.concatenate(results) if results else np.empty((0, 0))
+
+    def _clear_checkpoints(self):
+        if not os.path.isdir(self.checkpoint_dir):
+            return
+        for name in os.listdir(self.checkpoint_dir):
+            os.remove(os.path.join(self.checkpoint_dir, name))
+
+    def _write_ann_index(self, directory, vectors):
+        """Builds the IVF index next to vectors.npy (small shards stay exact-search only)."""
+        wanted = self.build_ann if self.build_ann is not None else len(vectors) >= ANN_MIN_VECTORS
+        if not wanted:
+            return
+        index = IVFIndex.build(vectors, n_lists=self.ann_lists)
+        index.save(os.path.join(directory, ANN_DIRNAME))
+        print(f"⚡ ANN index built: {index.n_lists} lists over {len(vectors)} vectors")
+
+    def _write_snapshot(self, version, shards, manifest):
+        """
+        📸 VERSIONED SNAPSHOT: The whole fabric is written to a staging directory and
+        renamed into snapshots/<version>/ in one step; readers only ever see complete ones.
+        🧩 Each region gets its own shard (vectors, metadata, lexical, ANN, flat views)
+        under shards/<REGION>/, so the engine only maps the shards a query's lineage needs.
+        `shards` is {REGION: (vectors, chunks)}.
+        """
+        target = snapshot_path(self.data_processed_dir, version)
+        if os.path.exists(os.path.join(target, "FABRIC_VERSION")):
+            # Content-addressed: an identical fabric is already on disk (e.g. a reverted manuscript)
+            return target
+        staging = staging_path(self.data_processed_dir, version)
+        for stale in (staging, target):
+            if os.path.isdir(stale):
+                shutil.rmtree(stale)
+        os.makedirs(staging)
+
+        for key, (vectors, chunks) in shards.items():
+            directory = shard_path(staging, key)
+            os.makedirs(directory)
+            np.save(os.path.join(directory, "vectors.npy"), vectors)
+            self._write_ann_index(directory, vectors)
+            write_fabric_store(os.path.join(directory, METADATA_DIRNAME), chunks)
+            write_lexical_index(os.path.join(directory, LEXICAL_DIRNAME), chunks)
+        with open(os.path.join(staging, SHARD_INDEX), "w") as f:
+            json.dump({key: len(chunks) for key, (_, chunks) in shards.items()}, f, sort_keys=True)
+
+        # Flattened overlay views reuse the engine's own lineage resolution over the staged shards
+        staged = FabricSnapshot(staging, self.region_parents)
+        for key in shards:
+            write_flat_views(os.path.join(shard_path(staging, key), FLAT_DIRNAME), staged, key)
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        # Written last: its presence marks a complete snapshot
+        with open(os.path.join(staging, "FABRIC_VERSION"), "w") as f:
+            f.write(version)
+        os.replace(staging, target)
+        return target
+
+    def _retire_flat_layout(self):
+        """Removes the pre-snapshot fabric files once a snapshot has been published."""
+        for name in ("vectors.npy", "manifest.json", "FABRIC_VERSION"):
+            path = os.path.join(self.data_processed_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        for name in (METADATA_DIRNAME, ANN_DIRNAME, LEXICAL_DIRNAME):
+            path = os.path.join(self.data_processed_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+    def run_indexing_pipeline(self):
+        """
+        Rebuilds the Knowledge Fabric, re-embedding only new or changed chunks, and
+        publishes it as a new snapshot. Returns the sync stats (added/changed/removed/reused).
+        """
+        files_config = discover_manuscripts(self.manuscripts_dir)
+        all_chunks = self.collect_chunks(files_config)
 
         if not all_chunks:
             print("⚠️ No XML logic nodes found. Indexing aborted.")
-            return
+            return None
 
-        # Generate Embeddings
-        texts = [c['text'] for c in all_chunks]
-        response = self.client.embeddings.create(input=texts, model="text-embedding-3-small")
-        vectors = [data.embedding for data in response.data]
+        self._dedupe_ids(all_chunks)
+        previous, previous_vectors, previous_parents, previous_sharded = self._load_previous_fabric()
+
+        # Diff the manuscripts against the manifest: reuse rows whose content hash is unchanged
+        stats = {"added": 0, "changed": 0, "removed": 0, "reused": 0}
+        hashes = [self._chunk_hash(c) for c in all_chunks]
+        rows = [None] * len(all_chunks)
+        pending = []
+        for i, (chunk, chunk_hash) in enumerate(zip(all_chunks, hashes)):
+            entry = previous.get(chunk['id'])
+            if entry is None:
+                stats["added"] += 1
+                pending.append(i)
+            elif entry["hash"] != chunk_hash:
+                stats["changed"] += 1
+                pending.append(i)
+            else:
+                stats["reused"] += 1
+                rows[i] = previous_vectors[entry.get("shard")][entry["row"]]
+
+        current_ids = {c['id'] for c in all_chunks}
+        stats["removed"] = sum(1 for chunk_id in previous if chunk_id not in current_ids)
+
+        # A different region hierarchy or flat format only re-flattens, and a pre-sharding fabric is only
+        # re-partitioned: same vectors, new snapshot
+        if not pending and not stats["removed"] and previous_parents == self.region_parents and previous_sharded:
+            print(f"✅ Knowledge Fabric already up to date ({stats['reused']} chunks reused).")
+            return stats
+
+        # Generate Embeddings (delta only, batched + checkpointed)
+        if pending:
+            embedded = self.embed_texts([all_chunks[i]['text'] for i in pending])
+            for i, vector in zip(pending, embedded):
+                rows[i] = vector
+
+        # 🧩 Partition by region: rows are numbered within their shard
+        shard_members = {}
+        for i, chunk in enumerate(all_chunks):
+            shard_members.setdefault(self.shard_key(chunk), []).append(i)
+        entries = {}
+        for key, members in shard_members.items():
+            for row, i in enumerate(members):
+                entries[all_chunks[i]['id']] = {"hash": hashes[i], "shard": key, "row": row}
+
+        manifest = {
+            "model": self.embedding_model,
+            "region_parents": self.region_parents,
+            "flat_format": FLAT_FORMAT,
+            "chunks": entries
+        }
+        # Content-derived fabric version: lets caches notice a re-index without reading the manifest
+        fabric_version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
-        # Save Logic Fabric
+        # Save Logic Fabric as a new snapshot, then flip the CURRENT pointer to it
+        self._report("publishing", chunks_total=len(all_chunks))
         os.makedirs(self.data_processed_dir, exist_ok=True)
-        np.save(self.vectors_path, np.array(vectors))
-        with open(self.metadata_path, "w") as f:
-            json.dump(all_chunks, f, indent=2)
+        vectors = normalize_rows(np.array(rows))
+        shards = {key: (vectors[members], [all_chunks[i] for i in members]) for key, members in shard_members.items()}
+        target = self._write_snapshot(fabric_version, shards, manifest)
+        publish_snapshot(self.data_processed_dir, fabric_version)
+        self._retire_flat_layout()
+        self._clear_checkpoints()
             
-        print(f"✅ Indexing Complete. Knowledge Fabric saved to {self.vectors_path}")
+        print(f"✅ Indexing Complete. Knowledge Fabric snapshot published to {target}")
+        print(f"📊 Sync: {stats['added']} added, {stats['changed']} changed, {stats['removed']} removed, {stats['reused']} reused")
+        return stats
 
 if __name__ == "__main__":
     indexer = AetherIndexer()
@@ -0,0 +1,234 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+
+# 🛡️ CLOUD-RESILIENT PATH ANCHOR
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if "logic" in BASE_DIR:
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+else:
+    PROJECT_ROOT = BASE_DIR
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.telemetry import STAGES
+
+# One SQLite file per host: every Streamlit worker appends to (and reads from) the same journal
+JOURNAL_PATH = os.getenv("AETHER_JOURNAL_PATH") or os.path.join(PROJECT_ROOT, "data", "audit_journal.db")
+JOURNAL_BUSY_TIMEOUT = 30       # seconds a writer waits for another worker's transaction
+HISTORY_PAGE_SIZE = 20
+EXPORT_PAGE_SIZE = 500
+EXPORT_SPOOL_BYTES = 4 * 1024 * 1024   # larger downloads spill from memory to a temp file
+TICKET_PREFIX = "VRTS-"
+TICKET_OFFSET = 100             # first ticket is VRTS-101, as before
+
+CSV_COLUMNS = ["id", "created_at", "query", "jurisdiction", "status", "healed", "response",
+               "cache_hit", "cached_from", "fabric_version"] + [f"t_{stage}_ms" for stage in STAGES]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    query TEXT,
+    jurisdiction TEXT,
+    status TEXT NOT NULL,
+    healed INTEGER NOT NULL DEFAULT 0,
+    response TEXT,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    cached_from TEXT,
+    fabric_version TEXT,
+    timings TEXT
+);
+CREATE TABLE IF NOT EXISTS audit_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tickets_issued INTEGER NOT NULL,
+    audits INTEGER NOT NULL,
+    governed INTEGER NOT NULL,
+    escalated INTEGER NOT NULL,
+    healed INTEGER NOT NULL,
+    cache_hits INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO audit_totals VALUES (1, 0, 0, 0, 0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS audits_no_update BEFORE UPDATE ON audits
+BEGIN SELECT RAISE(ABORT, 'audit journal is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audits_no_delete BEFORE DELETE ON audits
+BEGIN SELECT RAISE(ABORT, 'audit journal is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_totals_increment_only BEFORE UPDATE ON audit_totals
+WHEN NEW.id != OLD.id
+  OR NEW.tickets_issued < OLD.tickets_issued OR NEW.audits < OLD.audits OR NEW.governed < OLD.governed
+  OR NEW.escalated < OLD.escalated OR NEW.healed < OLD.healed OR NEW.cache_hits < OLD.cache_hits
+  OR NEW.audits > (SELECT COALESCE(MAX(seq), 0) FROM audits)
+BEGIN SELECT RAISE(ABORT, 'audit totals only move forward with the journal'); END;
+CREATE TRIGGER IF NOT EXISTS audit_totals_no_delete BEFORE DELETE ON audit_totals
+BEGIN SELECT RAISE(ABORT, 'audit totals only move forward with the journal'); END;
+"""
+
+_COLUMNS = "seq, ticket_id, created_at, query, jurisdiction, status, healed, response, cache_hit, cached_from, fabric_version, timings"
+
+class AuditJournal:
+    """
+    🧾 DURABLE AUDIT JOURNAL: Append-only SQLite log of every governance audit,
+    shared by all workers on the host (WAL mode, so readers never block the writer).
+    Running totals are updated in the same transaction as each append, so the
+    governance metrics are a single-row read no matter how long the journal gets.
+    Ticket IDs come from a counter in that same row: unique across sessions and workers.
+    Triggers reject edits to audits and any totals update that is not an increment.
+    """
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Autocommit connection: writes open their own BEGIN IMMEDIATE transactions
+        self._db = sqlite3.connect(path, timeout=JOURNAL_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def _write(self, fn):
+        """Runs fn(db) inside one immediate transaction, serialized across threads and processes."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+                self._db.execute("COMMIT")
+                return result
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _issue(db):
+        db.execute("UPDATE audit_totals SET tickets_issued = tickets_issued + 1 WHERE id = 1")
+        issued = db.execute("SELECT tickets_issued FROM audit_totals WHERE id = 1").fetchone()[0]
+        return f"{TICKET_PREFIX}{issued + TICKET_OFFSET}"
+
+    def issue_ticket_id(self):
+        """Reserves the next ticket ID (e.g. to show it while the answer is still streaming)."""
+        return self._write(self._issue)
+
+    def append(self, entry, timings=None):
+        """
+        Journals one audit and folds it into the running totals. `entry` holds
+        query/jurisdiction/status/healed/response/cache_hit/cached_from/fabric_version
+        and optionally a reserved "id". Returns the stored record (see history()).
+        """
+        created_at = time.time()
+        timings = {stage: round(elapsed, 1) for stage, elapsed in (timings or {}).items()}
+        status = entry.get("status")
+        healed = bool(entry.get("healed"))
+        cache_hit = bool(entry.get("cache_hit"))
+
+        def write(db):
+            ticket_id = entry.get("id") or self._issue(db)
+            cursor = db.execute(
+                f"INSERT INTO audits ({_COLUMNS}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ticket_id, created_at, entry.get("query"), entry.get("jurisdiction"), status, int(healed),
+                 entry.get("response"), int(cache_hit), entry.get("cached_from") or "",
+                 entry.get("fabric_version"), json.dumps(timings))
+            )
+            db.execute(
+                "UPDATE audit_totals SET audits = audits + 1, governed = governed + ?, escalated = escalated + ?, "
+                "healed = healed + ?, cache_hits = cache_hits + ? WHERE id = 1",
+                (int(status == "GOVERNED"), int(status == "ESCALATED"), int(healed), int(cache_hit))
+            )
+            return cursor.lastrowid, ticket_id
+
+        seq, ticket_id = self._write(write)
+        return dict(entry, id=ticket_id, seq=seq, created_at=created_at, healed=healed, cache_hit=cache_hit,
+                    cached_from=entry.get("cached_from") or "",
+                    **{f"t_{stage}_ms": elapsed for stage, elapsed in timings.items()})
+
+    def metrics(self):
+        """{"audits", "governed", "escalated", "healed", "cache_hits"} across the whole journal."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT audits, governed, escalated, healed, cache_hits FROM audit_totals WHERE id = 1"
+            ).fetchone()
+        return dict(row)
+
+    @staticmethod
+    def _record(row):
+        record = {
+            "id": row["ticket_id"], "seq": row["seq"], "created_at": row["created_at"],
+            "query": row["query"], "jurisdiction": row["jurisdiction"], "status": row["status"],
+            "healed": bool(row["healed"]), "response": row["response"], "cache_hit": bool(row["cache_hit"]),
+            "cached_from": row["cached_from"], "fabric_version": row["fabric_version"]
+        }
+        for stage, elapsed in json.loads(row["timings"] or "{}").items():
+            record[f"t_{stage}_ms"] = elapsed
+        return record
+
+    def history(self, limit=HISTORY_PAGE_SIZE, before=None):
+        """
+        Newest-first page of audits. Pass the last record's "seq" as `before` for the
+        next (older) page: keyset pagination, so deep pages cost the same as the first.
+        """
+        query = f"SELECT {_COLUMNS} FROM audits"
+        params = []
+        if before is not None:
+            query += " WHERE seq < ?"
+            params.append(before)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    def iter_csv(self, page_size=EXPORT_PAGE_SIZE):
+        """
+        📥 STREAMED EXPORT: Yields the journal as CSV text, oldest first, one page of
+        rows at a time, so an export never holds the whole history in memory.
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        after = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM audits WHERE seq > ? ORDER BY seq LIMIT ?", (after, page_size)
+                ).fetchall()
+            for row in rows:
+                writer.writerow(self._record(row))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["seq"]
+
+    def export_file(self, spool_bytes=EXPORT_SPOOL_BYTES):
+        """
+        The CSV export as a rewound binary file object (e.g. for st.download_button):
+        written page by page into a spooled temp file that spills to disk past `spool_bytes`.
+        """
+        out = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        for chunk in self.iter_csv():
+            out.write(chunk.encode("utf-8"))
+        out.seek(0)
+        return out
+
+    def export_csv(self, out):
+        """Writes the CSV export to a text file object; returns it."""
+        for chunk in self.iter_csv():
+            out.write(chunk)
+        return out
+
+if __name__ == "__main__":
+    # 📥 Headless export: python journal.py [audits.csv]  (stdout when no path is given)
+    journal = AuditJournal()
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w", newline="", encoding="utf-8") as f:
+            journal.export_csv(f)
+        print(f"✅ {journal.metrics()['audits']} audits exported to {sys.argv[1]}")
+    else:
+        journal.export_csv(sys.stdout)
@@ -0,0 +1,134 @@
+import os
+import re
+import math
+import shutil
+import numpy as np
+
+LEXICAL_DIRNAME = "lexical"
+ENTITY_MAX_NGRAM = 4        # "multi policy" / "uninsured motorist" style names span a few words
+ENTITY_MIN_KEY_LENGTH = 4   # ignore tiny keys that would match ordinary words
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens; camelCase is split so 'SafeDriver' also yields 'safe', 'driver'."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text or "")
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def entity_key(text):
+    """'Multi-Policy', 'MultiPolicy' and 'multi policy' all collapse to 'multipolicy'."""
+    return re.sub(r"[^a-z0-9]", "", (text or "").lower())
+
+def _save_csr(directory, prefix, mapping, weights=False):
+    """Sorted keys + offsets + rows (+ optional weights): binary-searchable straight off a memory map."""
+    keys = sorted(mapping)
+    rows, values, offsets = [], [], [0]
+    for key in keys:
+        postings = mapping[key]
+        rows.extend(postings)
+        if weights:
+            values.extend(postings.values())
+        offsets.append(len(rows))
+    width = max([len(k) for k in keys] + [1])
+    np.save(os.path.join(directory, f"{prefix}_keys.npy"), np.array(keys, dtype=f"<U{width}"))
+    np.save(os.path.join(directory, f"{prefix}_offsets.npy"), np.array(offsets, dtype=np.int64))
+    np.save(os.path.join(directory, f"{prefix}_rows.npy"), np.array(rows, dtype=np.int64))
+    if weights:
+        np.save(os.path.join(directory, f"{prefix}_weights.npy"), np.array(values, dtype=np.float32))
+
+def write_lexical_index(directory, chunks):
+    """
+    🔤 LEXICAL FABRIC: Built at index time alongside the vectors.
+    - entities: normalized node names -> rows (exact-hit fast path)
+    - postings: tokens of id/name/tag/semantic-bridge synonyms -> rows + term frequency (BM25)
+    """
+    entities, postings, doc_len = {}, {}, []
+    for row, chunk in enumerate(chunks):
+        m = chunk['metadata']
+        # Nodes identified only by their tag (e.g. <FormMasterList>) are generic, not entities
+        if m.get('name') and m.get('name') != m.get('tag'):
+            key = entity_key(m['name'])
+            if len(key) >= ENTITY_MIN_KEY_LENGTH:
+                entities.setdefault(key, []).append(row)
+
+        tokens = tokenize(f"{chunk['id']} {chunk['text']}")
+        doc_len.append(len(tokens))
+        for token in tokens:
+            tf = postings.setdefault(token, {})
+            tf[row] = tf.get(row, 0) + 1
+
+    tmp_dir = f"{directory}.tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    _save_csr(tmp_dir, "entity", entities)
+    _save_csr(tmp_dir, "token", postings, weights=True)
+    np.save(os.path.join(tmp_dir, "doc_len.npy"), np.array(doc_len, dtype=np.float32))
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp_dir, directory)
+
+class LexicalIndex:
+    """Read side: every array memory-mapped, keys found by binary search."""
+    def __init__(self, directory):
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        self._entity = (load("entity_keys"), load("entity_offsets"), load("entity_rows"))
+        self._token = (load("token_keys"), load("token_offsets"), load("token_rows"))
+        self._token_weights = load("token_weights")
+        self._doc_len = load("doc_len")
+        self._avg_len = float(np.mean(self._doc_len)) if len(self._doc_len) else 1.0
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, "doc_len.npy"))
+
+    @staticmethod
+    def _find(csr, key):
+        keys, offsets, _ = csr
+        i = int(np.searchsorted(keys, key))
+        if i < len(keys) and keys[i] == key:
+            return int(offsets[i]), int(offsets[i + 1])
+        return None
+
+    def exact_entities(self, query):
+        """Rows whose node name appears verbatim in the query (as 1..ENTITY_MAX_NGRAM adjacent words)."""
+        tokens = re.findall(r"[a-z0-9]+", query.lower())
+        rows = []
+        for n in range(ENTITY_MAX_NGRAM, 0, -1):
+            for start in range(len(tokens) - n + 1):
+                key = "".join(tokens[start:start + n])
+                if len(key) < ENTITY_MIN_KEY_LENGTH:
+                    continue
+                span = self._find(self._entity, key)
+                if span:
+                    rows.extend(int(r) for r in self._entity[2][span[0]:span[1]])
+        return list(dict.fromkeys(rows))
+
+    def search(self, query, k):
+        """BM25 top-k (rows, scores) over ids, names, tags and semantic-bridge synonyms."""
+        n_docs = len(self._doc_len)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for token in set(tokenize(query)):
+            span = self._find(self._token, token)
+            if not span:
+                continue
+            rows = np.asarray(self._token[2][span[0]:span[1]])
+            tf = np.asarray(self._token_weights[span[0]:span[1]])
+            idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self._doc_len[rows]) / self._avg_len)
+            scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        hits = np.flatnonzero(scores)
+        if len(hits) == 0:
+            return hits, scores[hits]
+        best = hits[np.argsort(scores[hits])[::-1][:k]]
+        return best, scores[best]
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuses several best-first lists of rows (or any hashable node refs): score = sum of 1 / (k + rank)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=fused.get, reverse=True)
@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import threading
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX hosts: only the in-process guard applies
+    fcntl = None
+
+# 🛡️ CLOUD-RESILIENT PATH ANCHOR
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if "logic" in BASE_DIR:
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+else:
+    PROJECT_ROOT = BASE_DIR
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+STATUS_FILENAME = "index_status.json"
+LOCK_FILENAME = "index.lock"
+STATUS_WRITE_INTERVAL = 0.5   # seconds between progress rewrites (phase changes always write)
+FAILED_RETRY_SECONDS = 60     # a failed run is retried automatically after this long
+
+def _try_lock(lock_file):
+    """Non-blocking exclusive lock; False when another process already holds it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+def _unlock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+class BackgroundProvisioner:
+    """
+    🏗️ BACKGROUND PROVISIONING: Runs the indexer on a daemon thread so no request
+    waits for a rebuild. A file lock elects a single indexing worker across every
+    Streamlit process; progress goes to index_status.json, which any worker can poll.
+    The engine keeps serving the last published snapshot until the new one lands.
+    """
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or os.path.join(PROJECT_ROOT, "data")
+        self.processed_dir = os.path.join(self.data_dir, "processed")
+        self.status_path = os.path.join(self.processed_dir, STATUS_FILENAME)
+        self.lock_path = os.path.join(self.processed_dir, LOCK_FILENAME)
+        self._thread = None
+        self._guard = threading.Lock()
+        self._status = {}
+        self._last_write = 0.0
+
+    def start(self, reason="startup"):
+        """Starts an indexing run unless one is already running here or in another worker."""
+        with self._guard:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            if self.lock_held():
+                return False
+            self._thread = threading.Thread(target=self._run, args=(reason,), name="aether-indexer", daemon=True)
+            self._thread.start()
+            return True
+
+    def lock_held(self):
+        """True while some process holds the indexing lock."""
+        if fcntl is None or not os.path.exists(self.lock_path):
+            return False
+        with open(self.lock_path, "a") as lock_file:
+            if not _try_lock(lock_file):
+                return True
+            _unlock(lock_file)
+            return False
+
+    def is_running(self):
+        return (self._thread is not None and self._thread.is_alive()) or self.lock_held()
+
+    def status(self):
+        """
+        Last reported status from whichever worker indexed:
+        {"state": idle|running|done|failed|interrupted, "phase", "files_parsed", "files_total",
+         "chunks_embedded", "chunks_total", "started_at", "updated_at", "finished_at", "error", "stats"}
+        """
+        try:
+            with open(self.status_path, "r") as f:
+                status = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"state": "idle"}
+        # A "running" status nobody holds the lock for belongs to a worker that died mid-run
+        if status.get("state") == "running" and not self.is_running():
+            status["state"] = "interrupted"
+        return status
+
+    def provisioning_due(self):
+        """
+        True when a fabric-less deployment should (re)start provisioning: nothing has
+        run yet, the last run was interrupted, or it failed at least FAILED_RETRY_SECONDS ago.
+        """
+        status = self.status()
+        state = status.get("state")
+        if state in ("idle", "interrupted"):
+            return True
+        return state == "failed" and time.time() - status.get("finished_at", 0) >= FAILED_RETRY_SECONDS
+
+    def _write_status(self, force=False, **fields):
+        self._status.update(fields, updated_at=time.time())
+        now = time.monotonic()
+        if not force and now - self._last_write < STATUS_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        tmp_path = f"{self.status_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._status, f)
+        os.replace(tmp_path, self.status_path)
+
+    def _on_progress(self, phase, **counts):
+        self._write_status(force=phase != self._status.get("phase"), phase=phase, **counts)
+
+    def _run(self, reason):
+        from logic.indexer import AetherIndexer
+        os.makedirs(self.processed_dir, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if not _try_lock(lock_file):
+                print("⏳ Another worker is already indexing the Knowledge Fabric.")
+                return
+            try:
+                self._status = {"state": "running", "reason": reason, "pid": os.getpid(),
+                                "started_at": time.time(), "phase": "starting"}
+                self._write_status(force=True)
+                stats = AetherIndexer(data_dir=self.data_dir, progress=self._on_progress).run_indexing_pipeline()
+                self._write_status(force=True, state="done", phase="done", stats=stats, finished_at=time.time())
+            except Exception as e:
+                print(f"❌ Background indexing failed: {e}")
+                self._write_status(force=True, state="failed", error=str(e), finished_at=time.time())
+            finally:
+                _unlock(lock_file)
@@ -1,9 +1,9 @@
 import os
-import json
+import sys
+import time
+import threading
 import numpy as np
 import lxml.etree as ET
-from openai import OpenAI
-import streamlit as st
 
 # 🛡️ CLOUD-RESILIENT PATH ANCHOR
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,63 +11,447 @@ if "logic" in BASE_DIR:
     PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
 else:
     PROJECT_ROOT = BASE_DIR
+SRC_DIR = os.path.dirname(BASE_DIR)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.clients import build_client, embedding_model
+from logic.embed_cache import EmbeddingCache, EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_PATH
+from logic.vector_store import load_vectors, normalize_rows, top_k
+from logic.ann import IVFIndex, ANN_DIRNAME, ANN_MIN_VECTORS, ANN_DEFAULT_PROBES
+from logic.fabric_store import FabricStore, METADATA_DIRNAME
+from logic.lexical import LexicalIndex, LEXICAL_DIRNAME, reciprocal_rank_fusion
+from logic.snapshots import fabric_dir, shard_path, read_shard_index
+from logic.flatten import FlatViews, FLAT_DIRNAME, minify_xml, layer_label
+from logic.telemetry import StageTimer
+
+TOP_K = 3
+# Candidates each ranker contributes before reciprocal rank fusion
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+# Region shards untouched this long are dropped from memory (Global is never evicted)
+SHARD_IDLE_SECONDS = int(os.getenv("AETHER_SHARD_IDLE_SECONDS", "600"))
+
+GLOBAL_REGION = "GLOBAL"
+
+# Overlay hierarchy (REGION -> parent overlay). Unlisted regions inherit straight from Global.
+REGION_PARENTS = {}
+
+LINEAGE_HEADER = "### PROJECT SENTINEL DATA LINEAGE ###\n\n"
+LINEAGE_FOOTER = "\n\n### END LINEAGE ###"
+
+def render_lineage(blocks):
+    """Merges lineage blocks into a single manuscript for the LLM."""
+    return LINEAGE_HEADER + "\n---\n".join(block["text"] for block in blocks) + LINEAGE_FOOTER
+
+class FabricShard:
+    """
+    🧩 FABRIC SHARD: Store, vectors, ANN + lexical indexes and flattened views for one
+    region (or, for fabrics indexed before sharding, every region in a single store).
+    Everything is memory-mapped; raw XML is decoded per matched row only.
+    """
+    def __init__(self, key, directory, region_parents, ann_min_vectors=ANN_MIN_VECTORS):
+        self.key = key
+        self.directory = directory
+        metadata_dir = os.path.join(directory, METADATA_DIRNAME)
+        vectors_path = os.path.join(directory, "vectors.npy")
+        if FabricStore.exists(metadata_dir) and os.path.exists(vectors_path):
+            self.metadata = FabricStore(metadata_dir)
+            self.vectors = load_vectors(vectors_path)
+        else:
+            self.metadata = []
+            self.vectors = np.array([])
+        self.ann = IVFIndex.load(os.path.join(directory, ANN_DIRNAME)) if len(self.vectors) >= ann_min_vectors else None
+        # Older fabrics have no lexical index: retrieval then stays vector-only
+        lexical_dir = os.path.join(directory, LEXICAL_DIRNAME)
+        self.lexical = LexicalIndex(lexical_dir) if len(self.metadata) and LexicalIndex.exists(lexical_dir) else None
+        # Index-time flattened overlay views (only if built for this same region hierarchy)
+        self.flat = FlatViews.load(os.path.join(directory, FLAT_DIRNAME), region_parents) if len(self.metadata) else None
+        self._build_name_index()
+        self.last_used = time.monotonic()
+
+    def _build_name_index(self):
+        """(REGION, name) -> row, built once per shard load so every lineage hop is O(1)."""
+        self.node_index = {}
+        if len(self.metadata):
+            regions = self.metadata.column('region')
+            names = self.metadata.column('name')
+            for row, (region, name) in enumerate(zip(regions, names)):
+                # First occurrence wins, matching the old linear scan
+                self.node_index.setdefault((region.upper(), name), row)
+
+    def search_batch(self, q_matrix, k, n_probe=ANN_DEFAULT_PROBES):
+        """Top-k (rows, scores) per query row: IVF probe when loaded, one matrix multiply otherwise."""
+        if self.ann is not None:
+            return [self.ann.search(self.vectors, q_vec, k, n_probe) for q_vec in q_matrix]
+        # Rows are unit-normalized at index time: cosine == dot product
+        sims = self.vectors @ q_matrix.T
+        results = []
+        for col in range(sims.shape[1]):
+            rows = top_k(sims[:, col], k)
+            results.append((rows, sims[rows, col]))
+        return results
+
+class FabricSnapshot:
+    """
+    📸 IMMUTABLE FABRIC SNAPSHOT: One published fabric version, partitioned into
+    region shards that load on first use and are evicted once idle (Global stays
+    pinned: every lineage ends there). Nodes are addressed as (shard, row) refs.
+    A query pins one snapshot for its whole lifetime, so a hot swap never mixes
+    rows from two versions.
+    """
+    def __init__(self, directory, region_parents, ann_min_vectors=ANN_MIN_VECTORS, shard_idle_seconds=SHARD_IDLE_SECONDS):
+        self.directory = directory
+        self.region_parents = region_parents
+        self.ann_min_vectors = ann_min_vectors
+        self.shard_idle_seconds = shard_idle_seconds
+        self.shard_rows = read_shard_index(directory)
+        self.sharded = self.shard_rows is not None
+        if not self.sharded:
+            # Pre-sharding fabric: one store holds every region, under the shard key None
+            self.shard_rows = {None: len(FabricStore(os.path.join(directory, METADATA_DIRNAME)))
+                               if FabricStore.exists(os.path.join(directory, METADATA_DIRNAME)) else 0}
+        self.node_count = sum(self.shard_rows.values())
+        self.version = None
+        version_path = os.path.join(directory, "FABRIC_VERSION")
+        if os.path.exists(version_path):
+            with open(version_path, "r") as f:
+                self.version = f.read().strip()
+        self._shards = {}
+        self._lock = threading.Lock()
+        self._chain_cache = {}
+
+    # --- Shards ---
+
+    def regions(self):
+        return sorted(key for key in self.shard_rows if key is not None)
+
+    def shard(self, key):
+        shard = self._shards.get(key)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(key)
+                if shard is None:
+                    directory = shard_path(self.directory, key) if self.sharded else self.directory
+                    shard = FabricShard(key, directory, self.region_parents, self.ann_min_vectors)
+                    self._shards[key] = shard
+        shard.last_used = time.monotonic()
+        return shard
+
+    def evict_idle(self):
+        """Drops shards nobody has touched for shard_idle_seconds; in-flight queries keep their reference."""
+        cutoff = time.monotonic() - self.shard_idle_seconds
+        with self._lock:
+            for key in [k for k, s in self._shards.items() if k != GLOBAL_REGION and s.last_used < cutoff]:
+                del self._shards[key]
+
+    def warm(self, keys=None):
+        """Loads shards up front (all of them by default), e.g. for benchmarks."""
+        for key in (keys if keys is not None else list(self.shard_rows)):
+            self.shard(key)
+
+    def scope(self, region=None):
+        """Shards a query may touch: the region's overlay lineage down to Global, or every shard."""
+        if not self.sharded:
+            return [None]
+        if region is None:
+            return list(self.shard_rows)
+        return [r for r in self.region_lineage(region.upper()) if r in self.shard_rows]
+
+    def _shard_for_region(self, region):
+        if not self.sharded:
+            return self.shard(None)
+        return self.shard(region) if region in self.shard_rows else None
+
+    # --- Nodes ---
+
+    def node(self, ref):
+        key, row = ref
+        return self.shard(key).metadata[row]
+
+    def field(self, ref, column):
+        key, row = ref
+        return self.shard(key).metadata.field(row, column)
+
+    def raw_xml(self, ref):
+        key, row = ref
+        return self.shard(key).metadata.raw_xml(row)
+
+    def flat_view(self, ref):
+        key, row = ref
+        shard = self.shard(key)
+        return shard.flat.get(row) if shard.flat is not None else None
+
+    # --- Retrieval ---
+
+    def vector_dim(self, keys=None):
+        """Vector width of the scoped shards (None when they hold no rows)."""
+        for key in (keys if keys is not None else self.scope()):
+            vectors = self.shard(key).vectors
+            if len(vectors):
+                return vectors.shape[1]
+        return None
+
+    def search_batch(self, q_matrix, k=TOP_K, queries=None, n_probe=ANN_DEFAULT_PROBES, keys=None):
+        """
+        Top-k ([refs], scores) per query row across the scoped shards. With `queries`,
+        vector and BM25 candidates are each ranked across shards, then fused by
+        reciprocal rank (🔀 HYBRID RANKING). Returned scores are always cosine
+        similarities, so the escalation threshold keeps its meaning, and the best
+        vector hit always stays in the fused top-k: BM25 can reorder the candidates
+        but never push out the node that decides escalation.
+        """
+        shards = [self.shard(key) for key in (keys if keys is not None else self.scope())]
+        shards = [shard for shard in shards if len(shard.metadata)]
+        hybrid = queries is not None and any(shard.lexical is not None for shard in shards)
+        n_candidates = HYBRID_CANDIDATES if hybrid else k
+        per_shard = [shard.search_batch(q_matrix, n_candidates, n_probe) for shard in shards]
+
+        results = []
+        for qi, q_vec in enumerate(q_matrix):
+            vec_hits = sorted(
+                (((shard.key, int(row)), float(score))
+                 for shard, hits in zip(shards, per_shard)
+                 for row, score in zip(*hits[qi])),
+                key=lambda hit: hit[1], reverse=True
+            )[:n_candidates]
+            if not hybrid:
+                results.append(([ref for ref, _ in vec_hits], [score for _, score in vec_hits]))
+                continue
+            lex_hits = sorted(
+                (((shard.key, int(row)), float(score))
+                 for shard in shards if shard.lexical is not None
+                 for row, score in zip(*shard.lexical.search(queries[qi], HYBRID_CANDIDATES))),
+                key=lambda hit: hit[1], reverse=True
+            )[:HYBRID_CANDIDATES]
+            refs = reciprocal_rank_fusion([[ref for ref, _ in vec_hits], [ref for ref, _ in lex_hits]], RRF_K)[:k]
+            if vec_hits and vec_hits[0][0] not in refs:
+                refs[-1] = vec_hits[0][0]
+            scores = [float(self.shard(key).vectors[row] @ q_vec) for key, row in refs]
+            results.append((refs, scores))
+        return results
+
+    def lexical_lookup(self, query, keys=None):
+        """Refs whose node name the query spells out verbatim. No embedding call."""
+        refs = []
+        for key in (keys if keys is not None else self.scope()):
+            shard = self.shard(key)
+            if shard.lexical is not None:
+                refs.extend((key, row) for row in shard.lexical.exact_entities(query))
+        return refs
+
+    # --- Lineage ---
+
+    def region_lineage(self, region):
+        """REGION -> parent overlay(s) -> GLOBAL, stopping on misconfigured loops."""
+        lineage = []
+        while region and region not in lineage:
+            lineage.append(region)
+            if region == GLOBAL_REGION:
+                break
+            region = self.region_parents.get(region, GLOBAL_REGION)
+        return lineage
+
+    def _resolve_parent(self, ref):
+        """Nearest node named by inheritsFrom: own overlay first, then up the region lineage."""
+        parent_name = self.field(ref, 'inheritsFrom')
+        if not parent_name:
+            return None
+        for region in self.region_lineage((self.field(ref, 'region') or '').upper()):
+            shard = self._shard_for_region(region)
+            candidate = shard.node_index.get((region, parent_name)) if shard is not None else None
+            if candidate is not None and (shard.key, candidate) != ref:
+                return shard.key, candidate
+        return None
+
+    def inheritance_chain(self, ref):
+        """
+        🛡️ SENTINEL SELF-HEALING CHAIN:
+        Ancestor refs nearest-first (region -> parent overlay -> global).
+        Memoized per ref; a cycle in inheritsFrom truncates the chain instead of looping.
+        """
+        cached = self._chain_cache.get(ref)
+        if cached is not None:
+            return cached
+
+        chain, visited = [], {ref}
+        current = self._resolve_parent(ref)
+        while current is not None:
+            if current in visited:
+                print(f"⚠️ Inheritance cycle detected at {self.field(current, 'id')}")
+                break
+            chain.append(current)
+            visited.add(current)
+
+            # Reuse an already memoized tail instead of walking it again
+            tail = self._chain_cache.get(current)
+            if tail is not None:
+                for ancestor in tail:
+                    if ancestor in visited:
+                        print(f"⚠️ Inheritance cycle detected at {self.field(ancestor, 'id')}")
+                        break
+                    chain.append(ancestor)
+                    visited.add(ancestor)
+                break
+            current = self._resolve_parent(current)
+
+        self._chain_cache[ref] = tuple(chain)
+        return self._chain_cache[ref]
 
 class AetherEngine:
-    def __init__(self):
+    def __init__(self, client=None, region_parents=None, ann_probes=ANN_DEFAULT_PROBES, ann_min_vectors=ANN_MIN_VECTORS,
+                 embed_cache_size=EMBED_CACHE_MAX_ENTRIES, embed_cache_path=EMBED_CACHE_PATH, data_dir=None,
+                 shard_idle_seconds=SHARD_IDLE_SECONDS):
         # 🛡️ Native Secret Handling (HF Secrets)
-        api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key)
+        self.client = client or build_client()
+        self.embedding_model = embedding_model(self.client)
+        
+        # ⚡ Query embeddings are reused across audits (LRU + optional SQLite tier)
+        self.embedding_cache = EmbeddingCache(max_entries=embed_cache_size, persist_path=embed_cache_path)
         
-        # Absolute Paths for Cloud Stability
-        self.data_processed_dir = os.path.join(PROJECT_ROOT, "data", "processed")
-        self.metadata_path = os.path.join(self.data_processed_dir, "metadata.json")
-        self.vectors_path = os.path.join(self.data_processed_dir, "vectors.npy")
+        # Absolute Paths for Cloud Stability (snapshots/<version>/ under processed/, named by CURRENT)
+        self.data_processed_dir = os.path.join(data_dir or os.path.join(PROJECT_ROOT, "data"), "processed")
+        
+        # ⚡ ANN knobs: lists probed per query, and the fabric size below which search stays exact
+        self.ann_probes = ann_probes
+        self.ann_min_vectors = ann_min_vectors
+        self.shard_idle_seconds = shard_idle_seconds
+        
+        self.region_parents = {k.upper(): v.upper() for k, v in (region_parents or REGION_PARENTS).items()}
+        
+        # Only one thread loads a newly published snapshot; the rest keep serving the old one
+        self._swap_lock = threading.Lock()
         
         # Load logic fabric
         self._load_fabric()
 
+    def _open_snapshot(self, directory):
+        return FabricSnapshot(directory, self.region_parents, self.ann_min_vectors, self.shard_idle_seconds)
+
     def _load_fabric(self):
-        """Force load the latest indexed data"""
-        if os.path.exists(self.metadata_path) and os.path.exists(self.vectors_path):
-            with open(self.metadata_path, "r") as f:
-                self.metadata = json.load(f)
-            self.vectors = np.load(self.vectors_path)
-        else:
-            self.metadata = []
-            self.vectors = np.array([])
+        """Force load the latest published snapshot (shards themselves load on first use)"""
+        self._snapshot = self._open_snapshot(fabric_dir(self.data_processed_dir))
 
-    def _get_parent_node(self, parent_name):
+    def _current_snapshot(self):
         """
-        🛡️ SENTINEL SELF-HEALING LOOKUP:
-        Finds the parent entity in the Global Layer.
+        🔁 HOT SWAP: Returns the snapshot a query should pin, loading a newly published
+        version first. In-flight queries hold their own reference, so they finish on the
+        snapshot they started with.
         """
-        for entry in self.metadata:
-            m = entry['metadata']
-            region_check = m.get('region', '').upper()
-            if m.get('name') == parent_name and "GLOBAL" in region_check:
-                return entry
-        return None
+        snapshot = self._snapshot
+        snapshot.evict_idle()
+        directory = fabric_dir(self.data_processed_dir)
+        if directory == snapshot.directory and snapshot.node_count:
+            return snapshot
+        if not self._swap_lock.acquire(blocking=False):
+            return snapshot
+        try:
+            if self._snapshot is snapshot:
+                loaded = self._open_snapshot(directory)
+                if loaded.node_count or not snapshot.node_count:
+                    self._snapshot = loaded
+                    if loaded.version != snapshot.version:
+                        print(f"🔁 Knowledge Fabric snapshot {loaded.version} swapped in.")
+        except Exception as e:
+            # Keep serving the last good snapshot
+            print(f"⚠️ Snapshot swap failed ({e}); serving {snapshot.version}.")
+        finally:
+            self._swap_lock.release()
+        return self._snapshot
+
+    def pin_snapshot(self):
+        """The live snapshot, for callers that run several lookups as one unit (e.g. an audit)."""
+        return self._current_snapshot()
+
+    @property
+    def fabric_version(self):
+        return self._current_snapshot().version
+
+    def fabric_node_count(self):
+        """Rows in the live snapshot (0 while the first fabric is still being provisioned)."""
+        return self._current_snapshot().node_count
+
+    def regions(self):
+        """Region shards in the live snapshot (empty for fabrics indexed before sharding)."""
+        return self._current_snapshot().regions()
+
+    def _embed_queries(self, texts):
+        """Query vectors via the embedding cache; only misses hit the API, in one batched call."""
+        def embed(missing):
+            resp = self.client.embeddings.create(input=missing, model=self.embedding_model)
+            return [data.embedding for data in resp.data]
+        return self.embedding_cache.get_or_embed(texts, self.embedding_model, embed)
+
+    def lexical_match(self, query, timings=None, region=None, snapshot=None):
+        """
+        (snapshot, refs) for an exact entity lookup. The router keeps the pair, so
+        get_lexical_result serves the same refs from the same snapshot without a second scan.
+        `snapshot` pins a pin_snapshot() result instead of the live one.
+        """
+        timer = StageTimer(timings)
+        snapshot = snapshot or self._current_snapshot()
+        with timer.span("lexical"):
+            return snapshot, snapshot.lexical_lookup(query, snapshot.scope(region))
+
+    def get_lexical_result(self, query, timings=None, region=None, match=None):
+        """
+        ⚡ DETERMINISTIC FAST PATH: The query names an entity outright, so the
+        matched nodes are served straight from the lexical index (score 1.0).
+        Most specific first: overlays with a longer lineage lead the payload.
+        `match` is a lexical_match() result already computed by the caller.
+        """
+        timer = StageTimer(timings)
+        snapshot, refs = match if match is not None else self.lexical_match(query, timings, region)
+        if not refs:
+            return self.get_aether_result(query, timings=timings, region=region, snapshot=snapshot)
+        refs = sorted(refs, key=lambda ref: len(snapshot.inheritance_chain(ref)), reverse=True)[:TOP_K]
+        return self._assemble_result(snapshot, refs, [1.0] * len(refs), 0.0, timer)
 
-    def get_aether_result(self, query, threshold=0.25):
+    def get_aether_result(self, query, threshold=0.25, timings=None, region=None, snapshot=None):
         """
         Retrieval logic with Anti-Hallucination & Sentinel Escalation.
+        Pass a dict as `timings` to receive per-stage milliseconds, and a `region`
+        (e.g. "CA") to search only that overlay and its ancestors.
         """
-        if not hasattr(self, 'metadata') or len(self.metadata) == 0:
-            self._load_fabric()
-            
-        if len(self.metadata) == 0:
-            return "ERROR", 0.0, {"metadata": {"raw_xml": "CRITICAL: Knowledge Fabric missing."}}
+        return self.get_aether_results([query], threshold, timings, region, snapshot)[0]
 
-        resp = self.client.embeddings.create(input=[query], model="text-embedding-3-small")
-        q_vec = np.array(resp.data[0].embedding)
-        
-        # Calculate Similarity
-        sims = np.dot(self.vectors, q_vec) / (np.linalg.norm(self.vectors, axis=1) * np.linalg.norm(q_vec))
+    def get_aether_results(self, queries, threshold=0.25, timings=None, region=None, snapshot=None):
+        """
+        Batch retrieval: one embeddings request for every uncached query and one
+        similarity pass per scoped shard for the whole batch, fused with BM25 when
+        the fabric has a lexical index. Returns a (status, score, payload) per query.
+        `region` limits the search to that overlay's lineage shards (None = every shard).
+        `timings` (optional dict) accumulates embed/search/lineage/assemble milliseconds.
+        `snapshot` pins a pin_snapshot() result instead of the live one.
+        """
+        timer = StageTimer(timings)
+        snapshot = snapshot or self._current_snapshot()
+        if snapshot.node_count == 0:
+            return [("ERROR", 0.0, {"metadata": {"raw_xml": "CRITICAL: Knowledge Fabric missing."}}) for _ in queries]
+        if not queries:
+            return []
+
+        with timer.span("embed"):
+            q_matrix = normalize_rows(np.vstack(self._embed_queries(list(queries))))
+        keys = snapshot.scope(region)
+        fabric_dim = snapshot.vector_dim(keys)
+        if fabric_dim is not None and fabric_dim != q_matrix.shape[1]:
+            # Fabric embedded by another model (e.g. indexed offline, queried via OpenAI): a resync rebuilds it
+            message = (f"CRITICAL: Knowledge Fabric vectors are {fabric_dim}-d but {self.embedding_model} "
+                       f"queries are {q_matrix.shape[1]}-d. Resync required.")
+            return [("ERROR", 0.0, {"metadata": {"raw_xml": message}}) for _ in queries]
         
         # 🚀 SENTINEL UPGRADE: Multi-Node Retrieval
         # We take the top 3 nodes instead of just 1 to catch combined factors (e.g. SafeDriver + MultiPolicy)
-        top_indices = np.argsort(sims)[-3:][::-1]
-        best_score = float(sims[top_indices[0]])
+        with timer.span("search"):
+            matches = snapshot.search_batch(q_matrix, TOP_K, list(queries), self.ann_probes, keys)
+        return [self._assemble_result(snapshot, refs, scores, threshold, timer) for refs, scores in matches]
+
+    def _assemble_result(self, snapshot, top_refs, top_scores, threshold, timer=None):
+        timer = timer or StageTimer()
+        # Fused rankings are not score-ordered: the best cosine (always among the
+        # fused refs, see search_batch) decides escalation
+        best_score = float(max(top_scores)) if len(top_scores) else 0.0
 
         # 🚨 PROJECT SENTINEL: ESCALATION TRIGGER
         if best_score < threshold:
@@ -79,36 +463,74 @@ class AetherEngine:
                 }
             }
 
-        # Collect data from relevant top matches
-        combined_context = []
-        primary_result = self.metadata[top_indices[0]]
-        
-        for i in top_indices:
-            if sims[i] >= threshold:
-                node = self.metadata[i]
-                m = node['metadata']
-                
-                # Check for inheritance
-                inherits_from = m.get('inheritsFrom')
-                source_label = f"[[ SOURCE: {m.get('region', 'Unknown').upper()} Layer ]]"
-                
-                content = f"{source_label}\nENTITY: {m.get('name')}\nCONTENT:\n{m.get('raw_xml')}\n"
-                
-                # Self-Heal: If this node has a parent, fetch it too
-                if inherits_from:
-                    parent = self._get_parent_node(inherits_from)
-                    if parent:
-                        content = f"[[ SOURCE: GLOBAL_BASE (Self-Healed) ]]\nENTITY: {inherits_from}\nCONTENT:\n{parent['metadata'].get('raw_xml')}\n\n" + content
-                
-                combined_context.append(content)
-
-        # Merge all found logic into a single manuscript for the LLM
-        final_xml = "### PROJECT SENTINEL DATA LINEAGE ###\n\n" + "\n---\n".join(combined_context) + "\n\n### END LINEAGE ###"
-        
+        matched = [(ref, float(score)) for ref, score in zip(top_refs, top_scores) if score >= threshold]
+
+        # Self-Heal lookup: resolve every matched node's inheritance chain up front
+        with timer.span("lineage"):
+            chains = {ref: snapshot.inheritance_chain(ref) for ref, _ in matched}
+
+        # The payload describes the best-scoring matched node, never a filtered-out BM25 pick
+        primary_ref = max(matched, key=lambda hit: hit[1])[0]
+        with timer.span("assemble"):
+            return "SUCCESS", best_score, self._build_lineage_payload(snapshot, primary_ref, matched, chains)
+
+    @staticmethod
+    def _section(snapshot, ref, label):
+        m = snapshot.node(ref)['metadata']
+        return f"[[ SOURCE: {label} ]]\nENTITY: {m.get('name')}\nCONTENT:\n{minify_xml(m.get('raw_xml'))}\n"
+
+    def _build_lineage_payload(self, snapshot, primary_ref, matched, chains):
+        """
+        One block per matched node, in match order, each carrying the best score that
+        pulled it in. Every node appears once across blocks: a shared Global parent is
+        emitted with the first match that needs it, and a node with a flattened view is
+        served as a single merged section instead of its parent + child pair. A matched
+        ancestor of a flattened match is folded into that view wherever it ranks, so the
+        output does not depend on whether the parent or the child matched first.
+        """
+        flats = {ref: snapshot.flat_view(ref) for ref, _ in matched}
+        folded = {ancestor for ref, flat in flats.items() if flat is not None for ancestor in chains[ref]}
+        scores = dict(matched)
+        blocks, emitted = [], set()
+        for ref, score in matched:
+            if ref in emitted or ref in folded:
+                continue
+            region = (snapshot.field(ref, 'region') or 'Unknown').upper()
+            flat = flats[ref]
+            if flat is not None:
+                flat_xml, provenance = flat
+                # Carries the best score of any matched ancestor folded into it
+                score = max([score] + [scores[r] for r in chains[ref] if r in scores])
+                name = snapshot.field(ref, 'name')
+                covered = [ref, *chains[ref]]
+                sections = [(covered, f"[[ SOURCE: {region} Layer ({provenance}) ]]\nENTITY: {name}\nCONTENT:\n{flat_xml}\n")]
+            else:
+                # Self-Heal: ancestors first so the lineage reads Global -> overlay -> match
+                sections, covered = [], []
+                for parent_ref in reversed(chains[ref]):
+                    if parent_ref in emitted:
+                        continue
+                    parent_region = (snapshot.field(parent_ref, 'region') or '').upper()
+                    sections.append(([parent_ref], self._section(snapshot, parent_ref, f"{layer_label(parent_region)} (Self-Healed)")))
+                    covered.append(parent_ref)
+                sections.append(([ref], self._section(snapshot, ref, f"{region} Layer")))
+                covered.append(ref)
+            emitted.update(covered)
+            blocks.append({
+                "ids": [snapshot.field(r, 'id') for r in covered],
+                "score": score,
+                "text": "\n".join(text for _, text in sections),
+                # Per-section ids let another payload's lineage drop just the sections it already has
+                "sections": [{"ids": [snapshot.field(r, 'id') for r in refs], "text": text} for refs, text in sections]
+            })
+
+        primary_result = snapshot.node(primary_ref)
         result_payload = {
             "id": primary_result["id"],
             "metadata": primary_result["metadata"].copy()
         }
-        result_payload['metadata']['raw_xml'] = final_xml
+        result_payload['metadata']['raw_xml'] = render_lineage(blocks)
+        # Structured form for callers that dedupe or budget context across payloads
+        result_payload['metadata']['lineage_blocks'] = blocks
 
-        return "SUCCESS", best_score, result_payload
\ No newline at end of file
+        return result_payload
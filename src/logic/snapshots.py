@@ -0,0 +1,80 @@
+import os
+import json
+import shutil
+
+SNAPSHOTS_DIRNAME = "snapshots"
+CURRENT_POINTER = "CURRENT"
+# Published snapshots kept on disk (the live one included) so rollbacks and slow readers stay safe
+SNAPSHOT_RETENTION = 3
+STAGING_PREFIX = ".staging-"
+# Inside a snapshot: shards/<REGION>/ per region plus shards.json ({REGION: rows})
+SHARDS_DIRNAME = "shards"
+SHARD_INDEX = "shards.json"
+
+def snapshots_root(processed_dir):
+    return os.path.join(processed_dir, SNAPSHOTS_DIRNAME)
+
+def snapshot_path(processed_dir, version):
+    return os.path.join(snapshots_root(processed_dir), version)
+
+def staging_path(processed_dir, version):
+    return os.path.join(snapshots_root(processed_dir), f"{STAGING_PREFIX}{version}")
+
+def shard_path(fabric_directory, region):
+    return os.path.join(fabric_directory, SHARDS_DIRNAME, region)
+
+def read_shard_index(fabric_directory):
+    """{REGION: rows} for a sharded fabric, None for the older single-store layout."""
+    try:
+        with open(os.path.join(fabric_directory, SHARD_INDEX), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def read_current_version(processed_dir):
+    """Version named by the CURRENT pointer, or None before the first snapshot is published."""
+    try:
+        with open(os.path.join(processed_dir, CURRENT_POINTER), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def fabric_dir(processed_dir):
+    """Directory holding the live fabric: the current snapshot, else the legacy flat layout."""
+    version = read_current_version(processed_dir)
+    if version and os.path.isdir(snapshot_path(processed_dir, version)):
+        return snapshot_path(processed_dir, version)
+    return processed_dir
+
+def publish_snapshot(processed_dir, version, keep=SNAPSHOT_RETENTION):
+    """
+    🔁 ATOMIC PUBLISH: CURRENT is rewritten via rename, so a reader sees either the
+    old version or the new one, never a half-written pointer or fabric.
+    """
+    pointer = os.path.join(processed_dir, CURRENT_POINTER)
+    tmp_pointer = f"{pointer}.tmp"
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, pointer)
+    prune_snapshots(processed_dir, keep)
+
+def prune_snapshots(processed_dir, keep=SNAPSHOT_RETENTION):
+    """Drops the oldest published snapshots beyond `keep`; the live one is never removed."""
+    root = snapshots_root(processed_dir)
+    if not os.path.isdir(root):
+        return
+    current = read_current_version(processed_dir)
+    published = [name for name in os.listdir(root)
+                 if not name.startswith(STAGING_PREFIX) and os.path.isdir(os.path.join(root, name))]
+    published.sort(key=lambda name: os.path.getmtime(os.path.join(root, name)), reverse=True)
+    retained = {current}
+    for name in published:
+        if len(retained) >= keep:
+            break
+        retained.add(name)
+    for name in published:
+        if name not in retained:
+            # Engines still reading an evicted snapshot keep their memory maps (POSIX unlink semantics)
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
@@ -0,0 +1,89 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+LATENCY_WINDOW = 500
+# Optional Prometheus textfile-collector target, rewritten after every audit
+PROMETHEUS_TEXTFILE = os.getenv("AETHER_PROMETHEUS_TEXTFILE")
+
+# Display order for the audit pipeline stages
+STAGES = ("lexical", "embed", "search", "lineage", "assemble", "retrieval", "llm_first_token", "llm", "total")
+
+class StageTimer:
+    """Lightweight spans: accumulates wall time per stage name (ms) into `timings`."""
+    def __init__(self, timings=None):
+        self.timings = timings if timings is not None else {}
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - start) * 1000)
+
+    def add(self, stage, elapsed_ms):
+        self.timings[stage] = self.timings.get(stage, 0.0) + elapsed_ms
+
+class LatencyRecorder:
+    """
+    📈 ROLLING STAGE LATENCIES: Keeps the last `window` samples per stage for
+    p50/p95, plus lifetime count/sum for Prometheus summaries.
+    """
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._count = {}
+        self._sum = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings):
+        with self._lock:
+            for stage, elapsed_ms in timings.items():
+                self._samples.setdefault(stage, deque(maxlen=self.window)).append(elapsed_ms)
+                self._count[stage] = self._count.get(stage, 0) + 1
+                self._sum[stage] = self._sum.get(stage, 0.0) + elapsed_ms
+
+    def _ordered_stages(self):
+        known = [s for s in STAGES if s in self._samples]
+        return known + sorted(s for s in self._samples if s not in STAGES)
+
+    def percentiles(self):
+        """{stage: {"p50": ms, "p95": ms, "count": n}} over the rolling window."""
+        with self._lock:
+            return {
+                stage: {
+                    "p50": float(np.percentile(self._samples[stage], 50)),
+                    "p95": float(np.percentile(self._samples[stage], 95)),
+                    "count": self._count[stage]
+                }
+                for stage in self._ordered_stages()
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (summary per stage)."""
+        lines = [
+            "# HELP aether_stage_latency_ms Audit pipeline stage latency in milliseconds.",
+            "# TYPE aether_stage_latency_ms summary"
+        ]
+        with self._lock:
+            for stage in self._ordered_stages():
+                samples = self._samples[stage]
+                for quantile in (0.5, 0.95, 0.99):
+                    value = float(np.percentile(samples, quantile * 100))
+                    lines.append(f'aether_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {value:.3f}')
+                lines.append(f'aether_stage_latency_ms_sum{{stage="{stage}"}} {self._sum[stage]:.3f}')
+                lines.append(f'aether_stage_latency_ms_count{{stage="{stage}"}} {self._count[stage]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=PROMETHEUS_TEXTFILE):
+        """Atomic rewrite so the scraper never reads a half-written file."""
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
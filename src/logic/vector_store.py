@@ -0,0 +1,38 @@
+import numpy as np
+
+VECTOR_DTYPE = np.float32
+
+def normalize_rows(vectors):
+    """Unit-normalizes each row (float32) so cosine similarity becomes a plain dot product."""
+    vectors = np.asarray(vectors, dtype=VECTOR_DTYPE)
+    if vectors.ndim == 1:
+        norm = np.linalg.norm(vectors)
+        return vectors / norm if norm else vectors
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def load_vectors(path):
+    """
+    🛡️ SHARED FABRIC: Memory-maps the vector matrix read-only so every Streamlit
+    worker on the host shares the same page cache instead of a private copy.
+    Legacy float64 / un-normalized fabrics are normalized into memory instead.
+    """
+    vectors = np.load(path, mmap_mode='r')
+    if vectors.ndim != 2 or len(vectors) == 0:
+        return vectors
+    sample_norms = np.linalg.norm(vectors[:16], axis=1)
+    if vectors.dtype != VECTOR_DTYPE or not np.allclose(sample_norms, 1.0, atol=1e-3):
+        return normalize_rows(vectors)
+    return vectors
+
+def top_k(sims, k):
+    """Indices of the k best scores, best first, via argpartition (O(n)) instead of a full sort."""
+    k = min(k, len(sims))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k < len(sims):
+        candidates = np.argpartition(sims, len(sims) - k)[-k:]
+    else:
+        candidates = np.arange(len(sims))
+    return candidates[np.argsort(sims[candidates])[::-1]]